@@ -6,12 +6,15 @@ Google Sheetsから釣果データを取得してフィルタリング・集計
 """
 
 import pandas as pd
+import numpy as np
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, List, Any
 import os
 import json
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,8 +26,37 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive'
 ]
 
+# データキャッシュ設定（Sheets APIのレート制限・レイテンシ対策）
+CACHE_TTL = 300  # 秒
+_CACHE = {"df": None, "ts": 0.0}
+
+# コールドスタート時に正規表現パース済みデータを再利用するためのディスクキャッシュ
+PARQUET_CACHE_PATH = "/tmp/fishing_cache.parquet"
+
+# 集計サマリーのメモ化キャッシュ（シート世代＝_CACHE["ts"]単位で無効化）
+# 単純なクエリ（魚種のみ／フィルタなし）のgroupby集計を世代ごとに1回に抑える
+_SUMMARY_CACHE = {"ts": 0.0, "by_key": {}}
+
+
+def invalidate_cache():
+    """キャッシュを明示的に破棄（データ更新後の再読み込み用）"""
+    _CACHE["df"] = None
+    _CACHE["ts"] = 0.0
+    _SUMMARY_CACHE["ts"] = 0.0
+    _SUMMARY_CACHE["by_key"].clear()
+    try:
+        if os.path.exists(PARQUET_CACHE_PATH):
+            os.remove(PARQUET_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Parquetキャッシュ削除失敗: {e}")
+
+@lru_cache(maxsize=1)
 def get_google_sheets_client():
-    """Google Sheets クライアントを取得（ハイブリッド認証）"""
+    """Google Sheets クライアントを取得（ハイブリッド認証）
+
+    認証トークンの取得はリクエスト毎に行うには重いので、
+    プロセス内で1回だけ実行して使い回す（失敗時はキャッシュされない）
+    """
     try:
         # 1. まず環境変数を試す（Render対応）
         credentials_json = os.environ.get('GOOGLE_CREDENTIALS_JSON')
@@ -56,39 +88,52 @@ def get_google_sheets_client():
         raise
 
 def load_fishing_data():
-    """釣果データをGoogle Sheetsから読み込み"""
+    """釣果データをGoogle Sheetsから読み込み（TTLキャッシュ付き）"""
+    # キャッシュが有効な間はAPIを呼ばずに再利用
+    if _CACHE["df"] is not None and time.time() - _CACHE["ts"] < CACHE_TTL:
+        logger.info("Using cached fishing data (age: %.0fs)", time.time() - _CACHE["ts"])
+        return _CACHE["df"]
+
+    # プロセス再起動直後はディスク上のParquetキャッシュを試す
+    # （ネットワーク取得と正規表現パースをまるごとスキップ）
+    try:
+        if os.path.exists(PARQUET_CACHE_PATH):
+            cache_age = time.time() - os.path.getmtime(PARQUET_CACHE_PATH)
+            if cache_age < CACHE_TTL:
+                df = pd.read_parquet(PARQUET_CACHE_PATH)
+                _CACHE["df"] = df
+                _CACHE["ts"] = os.path.getmtime(PARQUET_CACHE_PATH)
+                logger.info(f"Loaded {len(df)} records from parquet cache (age: {cache_age:.0f}s)")
+                return df
+    except Exception as e:
+        logger.warning(f"Parquetキャッシュ読み込み失敗（通常取得にフォールバック）: {e}")
+
     try:
         client = get_google_sheets_client()
         # 既存システムと同じ方法でスプレッドシートを開く
         spreadsheet = client.open("本牧海釣り施設データ")
         
         # 釣果データシート（既存システムと同じシート名を使用）
-        worksheet = spreadsheet.worksheet('釣果データ')
-        data = worksheet.get_all_records()
-        
+        # get_all_records()はセル単位でPython辞書を組み立てる最も遅い経路のため、
+        # batchGetエンドポイントで2次元リストを1リクエストで取得してDataFrame化する
+        resp = spreadsheet.values_batch_get(ranges=['釣果データ'])
+        rows = resp['valueRanges'][0].get('values', [])
+
         # デバッグ情報
-        logger.info(f"Worksheet name: {worksheet.title}")
-        logger.info(f"Raw data count: {len(data)}")
-        if len(data) > 0:
-            logger.info(f"First record keys: {list(data[0].keys())}")
-            logger.info(f"First record sample: {data[0]}")
+        logger.info(f"Raw data count: {max(len(rows) - 1, 0)}")
+        if len(rows) > 1:
+            logger.info(f"Header columns: {rows[0]}")
+            logger.info(f"First record sample: {rows[1]}")
         else:
             logger.warning("No data found in worksheet")
             # 全シート名を確認
             all_sheets = [ws.title for ws in spreadsheet.worksheets()]
             logger.info(f"Available sheets: {all_sheets}")
-            # データが入っているシートを探す
-            for sheet in spreadsheet.worksheets():
-                try:
-                    sheet_data = sheet.get_all_records()
-                    logger.info(f"Sheet '{sheet.title}': {len(sheet_data)} records")
-                except Exception as e:
-                    logger.info(f"Sheet '{sheet.title}': Error reading - {str(e)}")
-        
-        if not data:
+
+        if len(rows) <= 1:
             raise ValueError("釣果データが空です")
-        
-        df = pd.DataFrame(data)
+
+        df = pd.DataFrame(rows[1:], columns=rows[0])
         
         # データ型変換・前処理（既存システムと同じ方法）
         if '日付' in df.columns:
@@ -96,31 +141,87 @@ def load_fishing_data():
             df['日付_clean'] = df['日付'].astype(str).str.split('(').str[0]
             df['日付'] = pd.to_datetime(df['日付_clean'], format='%Y/%m/%d', errors='coerce')
         
-        # 数値カラムの変換
+        # 数値カラムの変換（nullable Int32で保持し、欠損はpd.NAのまま持ち回す）
         numeric_columns = ['釣果数']
         for col in numeric_columns:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int32')
         
-        # 水温処理：'11.0℃' -> 11.0
+        # 水温処理：'11.0℃' -> 11.0（正規表現ではなく末尾単位の除去で数値化）
         if '水温' in df.columns:
-            df['水温'] = df['水温'].astype(str).str.extract(r'(\d+\.?\d*)').astype(float)
-        
-        # 来場者数処理：'174名' -> 174  
+            df['水温'] = pd.to_numeric(
+                df['水温'].astype(str).str.rstrip('℃'), errors='coerce'
+            ).astype('float32')
+
+        # 来場者数処理：'174名' -> 174
         if '来場者数' in df.columns:
-            df['来場者数'] = df['来場者数'].astype(str).str.extract(r'(\d+)').astype(int)
-        
-        # 欠損値・異常値の処理
-        df = df.dropna(subset=['日付', '魚種'])
-        df = df[df['釣果数'] >= 0]  # 負数を除外
+            df['来場者数'] = pd.to_numeric(
+                df['来場者数'].astype(str).str.rstrip('名人'), errors='coerce'
+            ).astype('Int32')
+        
+        # 欠損値・異常値の処理（1本のマスクに融合して割り当てを1回にする）
+        valid_mask = (
+            df['日付'].notna().to_numpy()
+            & df['魚種'].notna().to_numpy()
+            & (df['釣果数'] >= 0).fillna(False).to_numpy()  # 欠損・負数を除外
+        )
+        df = df.loc[valid_mask].reset_index(drop=True)
+
+        # 文字列カラムをcategory化（等値フィルタとgroupbyを整数コード比較にする）
+        for col in ['魚種', '天気', '潮', '釣り場']:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         
         logger.info(f"Loaded {len(df)} fishing records from Google Sheets")
+
+        # キャッシュ更新
+        _CACHE["df"] = df
+        _CACHE["ts"] = time.time()
+        try:
+            df.to_parquet(PARQUET_CACHE_PATH)
+        except Exception as e:
+            logger.warning(f"Parquetキャッシュ書き込み失敗: {e}")
+
         return df
         
     except Exception as e:
         logger.error(f"Failed to load fishing data: {str(e)}")
         raise
 
+
+def _build_filter_mask(
+    df: pd.DataFrame,
+    fish: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    weather: Optional[str],
+    tide: Optional[str]
+) -> np.ndarray:
+    """検索条件を1本のブールマスクに畳み込む（中間DataFrameを作らない）"""
+    mask = np.ones(len(df), dtype=bool)
+
+    # 魚種フィルター
+    if fish and fish.lower() != "all":
+        mask &= (df['魚種'] == fish).to_numpy()
+
+    # 期間フィルター
+    if start_date:
+        mask &= (df['日付'] >= pd.to_datetime(start_date)).to_numpy()
+
+    if end_date:
+        mask &= (df['日付'] <= pd.to_datetime(end_date)).to_numpy()
+
+    # 天気フィルター
+    if weather:
+        mask &= (df['天気'] == weather).to_numpy()
+
+    # 潮フィルター
+    if tide:
+        mask &= (df['潮'] == tide).to_numpy()
+
+    return mask
+
+
 async def get_historical_data(
     fish: str = "all",
     start_date: Optional[str] = None,
@@ -137,60 +238,46 @@ async def get_historical_data(
         df = load_fishing_data()
         original_count = len(df)
         
-        # フィルタリング
-        filtered_df = df.copy()
-        
-        # 魚種フィルター
-        if fish and fish.lower() != "all":
-            filtered_df = filtered_df[filtered_df['魚種'] == fish]
-            logger.info(f"Fish filter applied: {fish}, {len(filtered_df)} records")
-        
-        # 期間フィルター
-        if start_date:
-            start_dt = pd.to_datetime(start_date)
-            filtered_df = filtered_df[filtered_df['日付'] >= start_dt]
-            logger.info(f"Start date filter applied: {start_date}, {len(filtered_df)} records")
-        
-        if end_date:
-            end_dt = pd.to_datetime(end_date)
-            filtered_df = filtered_df[filtered_df['日付'] <= end_dt]
-            logger.info(f"End date filter applied: {end_date}, {len(filtered_df)} records")
-        
-        # 天気フィルター
-        if weather:
-            filtered_df = filtered_df[filtered_df['天気'] == weather]
-            logger.info(f"Weather filter applied: {weather}, {len(filtered_df)} records")
-        
-        # 潮フィルター
-        if tide:
-            filtered_df = filtered_df[filtered_df['潮'] == tide]
-            logger.info(f"Tide filter applied: {tide}, {len(filtered_df)} records")
-        
-        # 日付順ソート（最新優先）
-        filtered_df = filtered_df.sort_values('日付', ascending=False)
-        
-        # 件数制限
-        display_df = filtered_df.head(limit)
-        
-        # レスポンス用データ準備
-        records = []
-        for _, row in display_df.iterrows():
-            record = {
-                "日付": row['日付'].strftime('%Y-%m-%d') if pd.notna(row['日付']) else None,
-                "天気": row.get('天気', ''),
-                "水温": float(row['水温']) if pd.notna(row['水温']) else None,
-                "潮": row.get('潮', ''),
-                "来場者数": int(row['来場者数']) if pd.notna(row['来場者数']) else None,
-                "魚種": row.get('魚種', ''),
-                "釣果数": int(row['釣果数']) if pd.notna(row['釣果数']) else 0,
-                "サイズ": row.get('サイズ', ''),
-                "釣り場": row.get('釣り場', ''),
-                "コメント": row.get('コメント', '')
-            }
-            records.append(record)
+        # フィルタリング（条件を1つのブールマスクに畳み込み、中間コピーを作らない）
+        mask = _build_filter_mask(df, fish, start_date, end_date, weather, tide)
+        filtered_df = df[mask]
+        logger.info(
+            f"Filters applied (fish={fish}, start={start_date}, end={end_date}, "
+            f"weather={weather}, tide={tide}): {len(filtered_df)} records"
+        )
+        
+        # 最新limit件のみ取り出す（全件ソートO(N log N)ではなく
+        # 上位抽出O(N log limit)。集計側は順序不問なので全体は未ソートのまま）
+        display_df = filtered_df.nlargest(limit, '日付')
+        
+        # レスポンス用データ準備（iterrowsの行ループを避けて一括変換）
+        response_columns = ['日付', '天気', '水温', '潮', '来場者数',
+                            '魚種', '釣果数', 'サイズ', '釣り場', 'コメント']
+        records_df = display_df.reindex(columns=response_columns)
+        records_df['日付'] = display_df['日付'].dt.strftime('%Y-%m-%d')
+        records_df['釣果数'] = records_df['釣果数'].fillna(0).astype(int)
+        text_columns = ['天気', '潮', '魚種', 'サイズ', '釣り場', 'コメント']
+        # category列はfillna('')できないため、ここでobjectに戻してから埋める
+        records_df[text_columns] = records_df[text_columns].astype(object).fillna('')
+        # 残りの欠損値（水温・来場者数など）はJSONのnullとして返す
+        records_df = records_df.astype(object).where(pd.notna(records_df), None)
+        records = records_df.to_dict(orient='records')
         
         # 集計データ生成
-        summary = generate_summary(filtered_df, original_count)
+        # よくあるクエリ（魚種のみ／フィルタなし）はシート世代ごとに1回だけ集計し、
+        # 以降は結果を使い回す。複合フィルタはキャッシュせず都度集計する
+        simple_query = not (start_date or end_date or weather or tide)
+        if simple_query:
+            if _SUMMARY_CACHE["ts"] != _CACHE["ts"]:
+                _SUMMARY_CACHE["by_key"].clear()
+                _SUMMARY_CACHE["ts"] = _CACHE["ts"]
+            cache_key = fish if fish and fish.lower() != "all" else "all"
+            summary = _SUMMARY_CACHE["by_key"].get(cache_key)
+            if summary is None:
+                summary = generate_summary(filtered_df, original_count)
+                _SUMMARY_CACHE["by_key"][cache_key] = summary
+        else:
+            summary = generate_summary(filtered_df, original_count)
         
         return {
             "success": True,
@@ -224,6 +311,18 @@ async def get_historical_data(
             }
         }
 
+def _grouped_catch_stats(df: pd.DataFrame, by) -> Dict[Any, Dict[str, Any]]:
+    """釣果数のグループ別集計（days/total_catch/avg_catch）を1パスで計算"""
+    stats = df.groupby(by, observed=True)['釣果数'].agg(
+        days='count',
+        total_catch='sum',
+        avg_catch='mean'
+    )
+    stats['avg_catch'] = stats['avg_catch'].round(1)
+    stats = stats.astype({'days': int, 'total_catch': int, 'avg_catch': float})
+    return stats.to_dict(orient='index')
+
+
 def generate_summary(df: pd.DataFrame, original_count: int) -> Dict[str, Any]:
     """データ集計サマリーを生成"""
     if len(df) == 0:
@@ -233,12 +332,16 @@ def generate_summary(df: pd.DataFrame, original_count: int) -> Dict[str, Any]:
         }
     
     try:
-        # 基本統計
-        total_catch = df['釣果数'].sum() if '釣果数' in df.columns else 0
-        avg_catch = df['釣果数'].mean() if '釣果数' in df.columns and len(df) > 0 else 0
-        max_catch = df['釣果数'].max() if '釣果数' in df.columns else 0
-        min_catch = df['釣果数'].min() if '釣果数' in df.columns else 0
-        
+        # 基本統計（1回のnumpy配列取り出しから全スカラーを導出）
+        if '釣果数' in df.columns:
+            catches = df['釣果数'].to_numpy()
+            total_catch = catches.sum()
+            avg_catch = catches.mean() if len(catches) > 0 else 0
+            max_catch = catches.max() if len(catches) > 0 else 0
+            min_catch = catches.min() if len(catches) > 0 else 0
+        else:
+            total_catch = avg_catch = max_catch = min_catch = 0
+
         # 期間情報
         date_range = {}
         if '日付' in df.columns and len(df) > 0:
@@ -246,46 +349,23 @@ def generate_summary(df: pd.DataFrame, original_count: int) -> Dict[str, Any]:
                 "start": df['日付'].min().strftime('%Y-%m-%d'),
                 "end": df['日付'].max().strftime('%Y-%m-%d')
             }
-        
-        # 月別集計
+
+        # 月別集計（iterrowsせずにnamed aggregation + to_dictで構築）
         by_month = {}
         if '日付' in df.columns:
-            monthly = df.groupby(df['日付'].dt.to_period('M'))['釣果数'].agg(['count', 'sum', 'mean']).round(1)
-            by_month = {
-                str(period): {
-                    "days": int(stats['count']),
-                    "total_catch": int(stats['sum']),
-                    "avg_catch": float(stats['mean'])
-                }
-                for period, stats in monthly.iterrows()
-            }
-        
+            monthly = _grouped_catch_stats(df, df['日付'].dt.to_period('M'))
+            by_month = {str(period): stats for period, stats in monthly.items()}
+
         # 魚種別集計
         by_fish_type = {}
         if '魚種' in df.columns:
-            fish_stats = df.groupby('魚種')['釣果数'].agg(['count', 'sum', 'mean']).round(1)
-            by_fish_type = {
-                fish: {
-                    "days": int(stats['count']),
-                    "total_catch": int(stats['sum']),
-                    "avg_catch": float(stats['mean'])
-                }
-                for fish, stats in fish_stats.iterrows()
-            }
-        
+            by_fish_type = _grouped_catch_stats(df, '魚種')
+
         # 天気別集計
         by_weather = {}
         if '天気' in df.columns:
-            weather_stats = df.groupby('天気')['釣果数'].agg(['count', 'sum', 'mean']).round(1)
-            by_weather = {
-                weather: {
-                    "days": int(stats['count']),
-                    "total_catch": int(stats['sum']),
-                    "avg_catch": float(stats['mean'])
-                }
-                for weather, stats in weather_stats.iterrows()
-            }
-        
+            by_weather = _grouped_catch_stats(df, '天気')
+
         return {
             "total_records": len(df),
             "original_records": original_count,
@@ -7,6 +7,7 @@
 - システム状態確認API
 """
 
+import asyncio
 import os
 import sys
 import glob
@@ -14,8 +15,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 
+import pandas as pd
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
 
@@ -24,19 +27,36 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 try:
-    from ml.data_loader import load_all_data
     from ml.models import AjiPredictor
     from api.visitor_analysis import VisitorAnalyzer
-    from api.historical import get_historical_data  # 既存関数を直接インポート
+    from api.historical import get_historical_data, load_fishing_data  # 既存関数を直接インポート
 except ImportError as e:
     print(f"❌ モジュールインポートエラー: {e}")
     sys.exit(1)
 
+# Numbaがあれば精度・信頼度スコアリングをJITコンパイル（任意依存）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未導入時は素のPython関数のまま使うダミーデコレータ"""
+        if args and callable(args[0]):
+            return args[0]
+        def wrapper(func):
+            return func
+        return wrapper
+
 # FastAPIアプリケーション初期化
 app = FastAPI(
     title="本牧海釣り施設 釣果予測API",
     description="機械学習による釣果予測と来場者数分析",
-    version="1.0.0"
+    version="1.0.0",
+    # レスポンスのJSONシリアライズをorjson（Rust実装）に切り替え
+    # /api/historicalのような件数の多いレスポンスで効果が大きい
+    default_response_class=ORJSONResponse
 )
 
 # CORS設定（Next.jsフロントエンド対応）- Phase 13修正
@@ -104,23 +124,43 @@ async def startup_event():
     
     print(f"  検索結果: {model_files}")
     
+    # JITカーネルのウォームアップ（初回リクエストにコンパイル時間を乗せない）
+    if NUMBA_AVAILABLE:
+        print("⚙️ Numbaカーネルをウォームアップ中...")
+        _accuracy_kernel(100, 120)
+        _confidence_kernel(1, 0, 20.0, 200, 150.0)
+
     try:
-        # 来場者数分析器初期化
+        # 来場者数分析器・予測モデル・釣果データを並行初期化
+        # （Sheets認証のネットワーク待ちとモデルのpickleロードを重ねて起動を短縮）
         print("👥 来場者数分析器初期化中...")
-        visitor_analyzer = VisitorAnalyzer()
-        print("✅ 来場者数分析器初期化完了")
-        
-        # アジ予測モデル初期化
         print("🎣 アジ予測モデル初期化中...")
         aji_predictor = AjiPredictor()
-        
+
+        async def _warm_fishing_data():
+            """釣果データを先読みして初回リクエストをキャッシュヒットにする"""
+            try:
+                await asyncio.to_thread(load_fishing_data)
+                print("✅ 釣果データのプリウォーム完了")
+            except Exception as e:
+                print(f"⚠️ 釣果データのプリウォーム失敗（初回リクエストで再取得）: {e}")
+
+        tasks = [asyncio.to_thread(VisitorAnalyzer), _warm_fishing_data()]
+
         # 最新モデルファイルを自動読み込み
+        latest_model = None
         if model_files:
             # 最新のファイルを取得（ファイル名の日時部分でソート）
             latest_model = sorted(model_files, reverse=True)[0]
             print(f"📁 最新モデル読み込み試行: {latest_model}")
-            
-            if aji_predictor.load_model(latest_model):
+            tasks.append(asyncio.to_thread(aji_predictor.load_model, latest_model))
+
+        results = await asyncio.gather(*tasks)
+        visitor_analyzer = results[0]
+        print("✅ 来場者数分析器初期化完了")
+
+        if latest_model:
+            if results[2]:
                 print(f"✅ アジ予測モデル読み込み完了: {os.path.basename(latest_model)}")
             else:
                 print(f"⚠️ モデル読み込み失敗: {latest_model}")
@@ -128,7 +168,7 @@ async def startup_event():
         else:
             print("⚠️ 学習済みモデルが見つかりません")
             aji_predictor = None
-            
+
     except Exception as e:
         print(f"❌ 初期化エラー: {e}")
         import traceback
@@ -231,17 +271,10 @@ async def get_actual_aji_catch(target_date: str) -> Optional[int]:
             
         print(f"🔍 実績釣果検索開始: {target_date}")
         
-        # Google Sheetsから全データを読み込み
-        data_result = load_all_data()
-        
-        # load_all_data()はタプル(fishing_df, comment_df)を返す
-        if isinstance(data_result, tuple) and len(data_result) >= 1:
-            df = data_result[0]  # 最初の要素が釣果データ
-            print("📊 タプル形式のデータを検出")
-        else:
-            print("❌ 予期しないデータ形式")
-            return None
-        
+        # 共有キャッシュ経由で釣果データを取得
+        # （historical側と同じbatchGet結果を使い、ここで別途Sheetsを読まない）
+        df = load_fishing_data()
+
         if df is None or df.empty:
             print("❌ データ読み込み失敗")
             return None
@@ -258,8 +291,8 @@ async def get_actual_aji_catch(target_date: str) -> Optional[int]:
         
         print(f"📅 利用可能日付範囲: {df[date_column].min()} ～ {df[date_column].max()}")
         
-        # アジデータをフィルタリング
-        aji_data = df[df[fish_column] == 'アジ'].copy()
+        # アジデータをフィルタリング（読み取りのみなのでコピーは不要）
+        aji_data = df[df[fish_column] == 'アジ']
         if aji_data.empty:
             print("❌ アジデータが見つかりません")
             print("🔍 利用可能な魚種:")
@@ -270,25 +303,22 @@ async def get_actual_aji_catch(target_date: str) -> Optional[int]:
             
         print(f"🎣 アジデータ数: {len(aji_data)}行")
         
-        # 指定日のデータを検索（複数の日付形式で試行）
-        search_formats = [
-            target_date,  # 2025/07/31
-            target_date.replace('/', '-'),  # 2025-07-31
-            f"{target_date}(木)" if target_date == "2025/07/31" else f"{target_date}({get_weekday_jp(target_date)})"  # 2025/07/31(木)
-        ]
-        
-        target_data = None
-        found_format = None
-        
-        for date_format in search_formats:
-            print(f"🔍 検索中: {date_format}")
-            temp_data = aji_data[aji_data[date_column] == date_format]
-            if not temp_data.empty:
-                target_data = temp_data
-                found_format = date_format
-                break
-        
-        if target_data is None or target_data.empty:
+        # 指定日のデータを検索（正規化済みdatetimeに対する1回の比較）
+        target_ts = pd.Timestamp(target_date.replace('/', '-'))
+        if pd.api.types.is_datetime64_any_dtype(aji_data[date_column]):
+            # historicalのロード時にパース済みのdatetime列をそのまま利用
+            date_series = aji_data[date_column]
+        else:
+            # 念のためのフォールバック: "2025/07/31(木)" 形式を正規化
+            date_series = pd.to_datetime(
+                aji_data[date_column].astype(str).str.split('(').str[0],
+                format='%Y/%m/%d', errors='coerce'
+            )
+
+        print(f"🔍 検索中: {target_ts.strftime('%Y/%m/%d')}")
+        target_data = aji_data[date_series == target_ts]
+
+        if target_data.empty:
             print(f"❌ {target_date}のアジデータが見つかりません")
             print("📅 利用可能なアジデータ日付（最新10件）:")
             recent_dates = aji_data[date_column].drop_duplicates().sort_values(ascending=False).head(10)
@@ -298,7 +328,7 @@ async def get_actual_aji_catch(target_date: str) -> Optional[int]:
         
         # 実績釣果数を取得
         actual_catch = int(target_data[catch_column].iloc[0])
-        print(f"✅ {found_format}のアジ実績: {actual_catch}匹")
+        print(f"✅ {target_ts.strftime('%Y/%m/%d')}のアジ実績: {actual_catch}匹")
         
         return actual_catch
         
@@ -308,41 +338,44 @@ async def get_actual_aji_catch(target_date: str) -> Optional[int]:
         traceback.print_exc()
         return None
 
-def get_weekday_jp(date_str: str) -> str:
-    """日付文字列から日本語曜日を取得"""
-    try:
-        from datetime import datetime
-        date_obj = datetime.strptime(date_str, '%Y/%m/%d')
-        weekdays = ['月', '火', '水', '木', '金', '土', '日']
-        return weekdays[date_obj.weekday()]
-    except:
-        return '不明'
+# 精度グレードコード → 名称（JITカーネルは整数コードで返す）
+_GRADE_NAMES = ("excellent", "good", "fair", "poor", "perfect")
 
-def calculate_accuracy_metrics(predicted: int, actual: int) -> Dict[str, Any]:
-    """予測精度メトリクスを計算"""
+
+@njit(cache=True)
+def _accuracy_kernel(predicted: int, actual: int):
+    """誤差量・誤差率・グレードコードを計算するスカラーカーネル"""
+    error_amount = abs(predicted - actual)
     if actual == 0:
         # 実績が0の場合の特別処理
-        error_percent = 100.0 if predicted > 0 else 0.0
-        accuracy_grade = "poor" if predicted > 0 else "perfect"
+        if predicted > 0:
+            return error_amount, 100.0, 3  # poor
+        return 0, 0.0, 4  # perfect
+
+    error_percent = (error_amount / actual) * 100.0
+
+    # 精度グレード判定
+    if error_percent <= 15.0:
+        grade = 0  # excellent
+    elif error_percent <= 25.0:
+        grade = 1  # good
+    elif error_percent <= 40.0:
+        grade = 2  # fair
     else:
-        error_amount = abs(predicted - actual)
-        error_percent = (error_amount / actual) * 100
-        
-        # 精度グレード判定
-        if error_percent <= 15:
-            accuracy_grade = "excellent"
-        elif error_percent <= 25:
-            accuracy_grade = "good"
-        elif error_percent <= 40:
-            accuracy_grade = "fair"
-        else:
-            accuracy_grade = "poor"
-    
+        grade = 3  # poor
+
+    return error_amount, error_percent, grade
+
+
+def calculate_accuracy_metrics(predicted: int, actual: int) -> Dict[str, Any]:
+    """予測精度メトリクスを計算"""
+    error_amount, error_percent, grade_code = _accuracy_kernel(predicted, actual)
+
     return {
-        "error_amount": abs(predicted - actual),
-        "error_percent": round(error_percent, 1),
-        "accuracy_grade": accuracy_grade,
-        "direction_correct": (predicted > actual and predicted > 0) or 
+        "error_amount": int(error_amount),
+        "error_percent": round(float(error_percent), 1),
+        "accuracy_grade": _GRADE_NAMES[grade_code],
+        "direction_correct": (predicted > actual and predicted > 0) or
                            (predicted < actual and actual > 0) or
                            (predicted == actual)
     }
@@ -448,99 +481,79 @@ async def predict_aji_catch(request: PredictionRequest):
             error=f"予測処理中にエラーが発生しました: {str(e)}"
         )
 
+# 予測入力エンコード用の定数（リクエスト毎のdict生成を避けるためモジュールに固定）
+_WEATHER_CODES = {
+    '晴れ': 0, '晴': 0,
+    '曇り': 1, '曇': 1,
+    '雨': 2,
+    '雪': 3
+}
+_TIDE_CODES = {
+    '大潮': 0,
+    '中潮': 1,
+    '小潮': 2,
+    '長潮': 3,
+    '若潮': 4
+}
+# 月(1〜12) → 季節コード（0=春 1=夏 2=秋 3=冬）のルックアップテーブル
+_SEASON_BY_MONTH = (3, 3, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3)
+
+
 def prepare_prediction_data(request: PredictionRequest) -> Dict[str, Any]:
     """予測データの前処理"""
-    
-    # 日付処理
+
+    # 日付処理（固定フォーマットなのでstrptimeより速いスライスで月を取り出す）
     date_str = request.date.replace('-', '/')  # YYYY-MM-DD → YYYY/MM/DD
-    date_obj = datetime.strptime(date_str, '%Y/%m/%d')
-    month = date_obj.month
-    
-    # 季節エンコード
-    if month in [3, 4, 5]:
-        season = 0  # 春
-    elif month in [6, 7, 8]:
-        season = 1  # 夏
-    elif month in [9, 10, 11]:
-        season = 2  # 秋
-    else:
-        season = 3  # 冬
-    
-    # 天気エンコード
-    weather_mapping = {
-        '晴れ': 0, '晴': 0,
-        '曇り': 1, '曇': 1,
-        '雨': 2,
-        '雪': 3
-    }
-    weather_encoded = weather_mapping.get(request.weather, 0)
-    
-    # 潮エンコード
-    tide_mapping = {
-        '大潮': 0,
-        '中潮': 1,
-        '小潮': 2,
-        '長潮': 3,
-        '若潮': 4
-    }
-    tide_encoded = tide_mapping.get(request.tide, 0)
-    
+    month = int(date_str[5:7])
+
     return {
         'month': month,
-        'season': season,
-        'weather': weather_encoded,
+        'season': _SEASON_BY_MONTH[month - 1],
+        'weather': _WEATHER_CODES.get(request.weather, 0),
         'temp': float(request.water_temp),
-        'tide': tide_encoded,
+        'tide': _TIDE_CODES.get(request.tide, 0),
         'visitors': int(request.visitors)
     }
 
-def get_prediction_confidence(prediction_data: Dict[str, Any], catch_count: float) -> str:
-    """予測信頼度の算出"""
-    
-    # 基本信頼度（Medium）
-    confidence = "Medium"
-    
-    # 条件による信頼度調整
-    factors = []
-    
+@njit(cache=True)
+def _confidence_kernel(season: int, weather: int, temp: float, visitors: int, catch_count: float) -> int:
+    """信頼度スコア（-5〜+5）を計算するスカラーカーネル"""
+    score = 0
+
     # 季節要因（春夏は信頼度高）
-    if prediction_data['season'] in [0, 1]:  # 春・夏
-        factors.append(1)
-    else:
-        factors.append(-1)
-    
+    score += 1 if (season == 0 or season == 1) else -1
+
     # 天気要因（晴れ・曇りは信頼度高）
-    if prediction_data['weather'] in [0, 1]:  # 晴れ・曇り
-        factors.append(1)
-    else:
-        factors.append(-1)
-    
+    score += 1 if (weather == 0 or weather == 1) else -1
+
     # 水温要因（15-25℃は信頼度高）
-    if 15 <= prediction_data['temp'] <= 25:
-        factors.append(1)
-    else:
-        factors.append(-1)
-    
+    score += 1 if (15.0 <= temp <= 25.0) else -1
+
     # 来場者数要因（100-500人は信頼度高）
-    if 100 <= prediction_data['visitors'] <= 500:
-        factors.append(1)
-    else:
-        factors.append(-1)
-    
+    score += 1 if (100 <= visitors <= 500) else -1
+
     # 予測値要因（50-500匹は信頼度高）
-    if 50 <= catch_count <= 500:
-        factors.append(1)
-    else:
-        factors.append(-1)
-    
-    # 総合判定
-    total_score = sum(factors)
+    score += 1 if (50.0 <= catch_count <= 500.0) else -1
+
+    return score
+
+
+def get_prediction_confidence(prediction_data: Dict[str, Any], catch_count: float) -> str:
+    """予測信頼度の算出"""
+    total_score = _confidence_kernel(
+        prediction_data['season'],
+        prediction_data['weather'],
+        float(prediction_data['temp']),
+        prediction_data['visitors'],
+        float(catch_count)
+    )
+
+    # 総合判定（基本はMedium）
     if total_score >= 3:
-        confidence = "High"
-    elif total_score <= -2:
-        confidence = "Low"
-    
-    return confidence
+        return "High"
+    if total_score <= -2:
+        return "Low"
+    return "Medium"
 
 def generate_recommendations(prediction_data: Dict[str, Any], catch_count: float) -> List[str]:
     """釣行アドバイス生成"""
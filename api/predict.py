@@ -1,9 +1,10 @@
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 import joblib
 import os
+import tempfile
 from datetime import datetime
+from functools import cache, lru_cache
 from typing import Dict, Any
 import logging
 
@@ -11,37 +12,157 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# treeliteがあればフォレストをネイティブコードにAOTコンパイル（任意依存）
+try:
+    import treelite
+    import treelite_runtime
+    TREELITE_AVAILABLE = True
+except ImportError:
+    TREELITE_AVAILABLE = False
+
+# Numbaがあれば決定木の走査をJITコンパイル（任意依存）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未導入時は素のPython関数のまま使うダミーデコレータ"""
+        if args and callable(args[0]):
+            return args[0]
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+@njit(cache=True)
+def _predict_forest(feat, features, thresholds, left, right, values):
+    """抽出済みフォレスト配列を反復走査して全木の平均を返す
+
+    sklearnのpredict()はPython/Cython境界の呼び出しと入力検証が
+    単一サンプルでは支配的になるため、木をSoA形式の配列に展開して
+    ループだけで評価する
+    """
+    n_trees = features.shape[0]
+    total = 0.0
+    for i in range(n_trees):
+        node = 0
+        while left[i, node] != -1:
+            if feat[features[i, node]] <= thresholds[i, node]:
+                node = left[i, node]
+            else:
+                node = right[i, node]
+        total += values[i, node]
+    return total / n_trees
+
+# エンコード用テーブル（呼び出し毎のdict生成を避けるためモジュール定数化）
+# 季節はindex=月で引くルックアップタプル（コード値は学習時のエンコードに対応）
+_SEASON_NAMES = ('spring', 'summer', 'autumn', 'winter')
+_SEASON_CODE_BY_MONTH = (None, 3, 3, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3)
+_WEATHER_MAP = {
+    '晴れ': 'sunny',
+    '快晴': 'sunny',
+    '曇り': 'cloudy',
+    '薄曇り': 'cloudy',
+    '雨': 'rainy',
+    '小雨': 'rainy',
+    '雪': 'snowy'
+}
+_TIDE_MAP = {
+    '大潮': 'spring',
+    '中潮': 'medium',
+    '小潮': 'neap',
+    '長潮': 'long',
+    '若潮': 'young'
+}
+_WEATHER_ENC = {'sunny': 0, 'cloudy': 1, 'rainy': 2, 'snowy': 3}
+_TIDE_ENC = {'spring': 0, 'medium': 1, 'neap': 2, 'long': 3, 'young': 4}
+
+# JIT走査用の量子化スケール（水温のみ0.1℃刻み→×10、他の特徴量はもともと整数）
+_FEATURE_SCALE = np.array([1, 1, 1, 10, 1, 1], dtype=np.float64)
+
+# 推奨コメントのルールテーブル
+# 述語はfeatures[0]＝[月, 季節, 天気, 水温, 潮, 来場者数]を受け取る
+_RULES = (
+    (lambda f: f[3] < 15, "水温が低めです。深場を狙うことをお勧めします。"),
+    (lambda f: f[3] > 25, "水温が高めです。朝夕の時間帯が狙い目です。"),
+    (lambda f: 15 <= f[3] <= 25, "水温は適温範囲です。"),
+    (lambda f: f[4] == 0, "大潮で潮の流れが強い日です。活性が期待できます。"),
+    (lambda f: f[4] == 2, "小潮で潮の動きが少ない日です。静かなポイントを狙いましょう。"),
+    (lambda f: f[5] > 300, "混雑が予想されます。早めの場所取りをお勧めします。"),
+    (lambda f: f[5] < 100, "比較的空いている日です。ゆっくり釣りを楽しめそうです。"),
+)
+
+@cache
+def _resolve_latest_model_path():
+    """modelsディレクトリから最新のアジモデルパスを解決
+
+    os.listdir＋ソートはコールドスタートの度に走らせる必要がないため
+    プロセス内で1回だけ実行して結果を使い回す
+    """
+    models_dir = "models"
+    if not os.path.exists(models_dir):
+        return None
+
+    # .pklはjoblib形式、.jsonはXGBoostネイティブ形式（.meta.jsonは
+    # サイドカーのメタデータなのでモデル本体としては数えない）
+    aji_models = [f for f in os.listdir(models_dir)
+                  if f.startswith('aji_') and f.endswith(('.pkl', '.json'))
+                  and not f.endswith('.meta.json')]
+    if not aji_models:
+        return None
+
+    # 最新のモデルファイルを使用（ファイル名の日時部分でソート）
+    return os.path.join(models_dir, sorted(aji_models)[-1])
+
+
 class FishingPredictor:
     def __init__(self):
         self.model = None
         self.model_path = None
         self.feature_columns = None
+        # 同一条件の再予測をメモ化（WebUIからの繰り返しリクエスト対策）
+        # load_model()がキャッシュを破棄するため先に作っておく
+        self._predict_cached = lru_cache(maxsize=4096)(self._predict_core)
+        # 特徴量ベクトル用の使い回しバッファ（毎回のnp.array割り当てを回避。
+        # sklearnの木はfloat32で走査するため、ここでfloat32にしてキャストコピーも省く）
+        self._feat_buf = np.empty((1, 6), dtype=np.float32)
+        # JIT走査用に展開したフォレスト配列（numba利用時のみ構築）と
+        # 量子化済み特徴量（int16）の使い回しバッファ
+        self._forest = None
+        self._feat_q = np.empty(6, dtype=np.int16)
+        # treeliteでAOTコンパイルしたフォレスト（利用可能時のみ構築）
+        self._fast_model = None
         self.load_model()
         
     def load_model(self):
         """学習済みモデルを読み込み"""
         try:
-            # modelsディレクトリからアジ予測モデルを探す
-            models_dir = "models"
-            if not os.path.exists(models_dir):
-                logger.warning(f"Models directory not found: {models_dir}. Creating fallback model...")
-                self._create_fallback_model()
-                return
-                
-            # アジモデルファイルを検索
-            aji_models = [f for f in os.listdir(models_dir) if f.startswith('aji_') and f.endswith('.pkl')]
-            if not aji_models:
+            # 旧モデルでの予測結果が残らないようにメモ化キャッシュを破棄
+            self._predict_cached.cache_clear()
+
+            # modelsディレクトリからアジ予測モデルを探す（結果はメモ化済み）
+            self.model_path = _resolve_latest_model_path()
+            if self.model_path is None:
                 logger.warning("No aji model files found. Creating fallback model...")
                 self._create_fallback_model()
                 return
-                
-            # 最新のモデルファイルを使用
-            latest_model = sorted(aji_models)[-1]
-            self.model_path = os.path.join(models_dir, latest_model)
-            
-            # モデル読み込み
-            model_data = joblib.load(self.model_path)
-            
+
+            if self.model_path.endswith('.json'):
+                # XGBoostネイティブ形式 + サイドカーのメタデータJSON
+                # （ml/models.pyのsave_modelが書く形式）
+                import json
+                import xgboost as xgb
+                model = xgb.XGBRegressor()
+                model.load_model(self.model_path)
+                with open(self.model_path + '.meta.json', 'r', encoding='utf-8') as f:
+                    model_data = json.load(f)
+                model_data['model'] = model
+            else:
+                # モデル読み込み（numpy配列はmmapで読み、RSSへのコピーを遅延させる）
+                model_data = joblib.load(self.model_path, mmap_mode='r')
+
             # モデルデータの形式をチェック
             if isinstance(model_data, dict):
                 # 辞書形式の場合（train.pyで保存された形式）
@@ -62,7 +183,11 @@ class FishingPredictor:
             logger.info(f"Model loaded successfully: {self.model_path}")
             logger.info(f"Model type: {type(self.model)}")
             logger.info(f"Feature columns: {self.feature_columns}")
-            
+
+            # JIT走査用のフォレスト配列とAOTコンパイル版を構築
+            self._build_forest_arrays()
+            self._build_compiled_model()
+
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             logger.warning("Creating fallback model...")
@@ -94,23 +219,98 @@ class FishingPredictor:
             
             # 特徴量列設定
             self.feature_columns = ['月', '季節_エンコード', '天気_エンコード', '水温', '潮_エンコード', '来場者数']
-            
+
+            # JIT走査用のフォレスト配列を構築
+            self._build_forest_arrays()
+            self._build_compiled_model()
+
             logger.info("Fallback model created successfully")
-            
+
         except Exception as e:
             logger.error(f"Failed to create fallback model: {e}")
             self.model = None
     
+    def _build_forest_arrays(self):
+        """RandomForestの各木をSoA形式の並列配列に展開してJIT走査用に保持
+
+        numbaが無い環境・RandomForest以外のモデルではNoneのままにして
+        sklearnのpredict()にフォールバックする
+        """
+        self._forest = None
+        if not NUMBA_AVAILABLE:
+            return
+
+        estimators = getattr(self.model, 'estimators_', None)
+        if not estimators:
+            return
+
+        try:
+            n_trees = len(estimators)
+            n_nodes = max(est.tree_.node_count for est in estimators)
+            features = np.full((n_trees, n_nodes), -2, dtype=np.int64)
+            thresholds = np.zeros((n_trees, n_nodes), dtype=np.float64)
+            left = np.full((n_trees, n_nodes), -1, dtype=np.int64)
+            right = np.full((n_trees, n_nodes), -1, dtype=np.int64)
+            values = np.zeros((n_trees, n_nodes), dtype=np.float64)
+
+            for i, est in enumerate(estimators):
+                tree = est.tree_
+                n = tree.node_count
+                features[i, :n] = tree.feature
+                thresholds[i, :n] = tree.threshold
+                left[i, :n] = tree.children_left
+                right[i, :n] = tree.children_right
+                values[i, :n] = tree.value.reshape(n)
+
+            # 閾値をint16に量子化（水温は×10スケール）。特徴量との比較が
+            # int16同士になり、走査中に動かすバイト数が半分になる。
+            # floor丸めのため、スケール後の特徴量が整数で表せる限り
+            # 分岐判定は量子化前と完全に一致する（葉のfeature=-2は比較されない）
+            scale_per_node = _FEATURE_SCALE[np.clip(features, 0, None)]
+            thresholds_q = np.floor(thresholds * scale_per_node).astype(np.int16)
+            self._forest = (features, thresholds_q, left, right, values)
+
+            # ウォームアップ（JITコンパイルを初回リクエストに乗せない）
+            _predict_forest(np.zeros(6, dtype=np.int16), *self._forest)
+            logger.info(f"Forest arrays built for JIT traversal: {n_trees} trees")
+
+        except Exception as e:
+            logger.warning(f"Forest array extraction failed (falling back to sklearn predict): {e}")
+            self._forest = None
+
+    def _build_compiled_model(self):
+        """treeliteでフォレストを共有ライブラリにAOTコンパイルして保持
+
+        numbaを入れたくない環境向けの代替経路。treelite未導入・
+        コンパイル失敗時はNoneのままにして他の予測経路を使う
+        """
+        self._fast_model = None
+        if not TREELITE_AVAILABLE or self.model is None:
+            return
+
+        try:
+            lib_path = os.path.join(tempfile.gettempdir(), 'aji_forest.so')
+            if hasattr(self.model, 'get_booster'):
+                # XGBoostモデルはbooster経由で取り込む
+                tl_model = treelite.Model.from_xgboost(self.model.get_booster())
+            else:
+                tl_model = treelite.sklearn.import_model(self.model)
+            tl_model.export_lib(
+                toolchain='gcc',
+                libpath=lib_path,
+                params={'parallel_comp': 1, 'quantize': 1},
+                verbose=False
+            )
+            self._fast_model = treelite_runtime.Predictor(lib_path)
+            logger.info(f"Compiled forest library ready: {lib_path}")
+
+        except Exception as e:
+            logger.warning(f"treelite compilation failed (falling back): {e}")
+            self._fast_model = None
+
     def get_season(self, month: int) -> str:
         """月から季節を取得"""
-        if month in [12, 1, 2]:
-            return 'winter'
-        elif month in [3, 4, 5]:
-            return 'spring'
-        elif month in [6, 7, 8]:
-            return 'summer'
-        else:
-            return 'autumn'
+        return _SEASON_NAMES[_SEASON_CODE_BY_MONTH[month]]
     
     def get_weekday_type(self, weekday: int) -> str:
         """曜日タイプを取得（0=月曜、6=日曜）"""
@@ -123,28 +323,70 @@ class FishingPredictor:
     
     def map_weather(self, weather: str) -> str:
         """天気を標準形式にマッピング"""
-        weather_mapping = {
-            '晴れ': 'sunny',
-            '快晴': 'sunny',
-            '曇り': 'cloudy',
-            '薄曇り': 'cloudy',
-            '雨': 'rainy',
-            '小雨': 'rainy',
-            '雪': 'snowy'
-        }
-        return weather_mapping.get(weather, 'cloudy')
-    
+        return _WEATHER_MAP.get(weather, 'cloudy')
+
     def map_tide(self, tide: str) -> str:
         """潮回りを標準形式にマッピング"""
-        tide_mapping = {
-            '大潮': 'spring',
-            '中潮': 'medium',
-            '小潮': 'neap',
-            '長潮': 'long',
-            '若潮': 'young'
-        }
-        return tide_mapping.get(tide, 'medium')
+        return _TIDE_MAP.get(tide, 'medium')
     
+    def _predict_core(self, date: str, weather: str, visitors: int, water_temp: float, tide: str) -> tuple:
+        """予測の本体（lru_cacheでメモ化される純粋関数部分）
+
+        同一入力に対して日付解析・特徴量生成・木の走査を繰り返さないよう、
+        レスポンス辞書の組み立てとは分離してタプルで返す
+        """
+        # 日付解析（固定フォーマットYYYY/MM/DDなのでstrptimeを通さず直接分解）
+        y, m, d = date.split('/')
+        month = int(m)
+        weekday = datetime(int(y), month, int(d)).weekday()
+
+        # 特徴量作成（季節はテーブル参照1回でコード値と名称の両方を得る）
+        season_encoded = _SEASON_CODE_BY_MONTH[month]
+        season = _SEASON_NAMES[season_encoded]
+        weekday_type = self.get_weekday_type(weekday)
+        weather_encoded = _WEATHER_ENC.get(self.map_weather(weather), 1)
+        tide_encoded = _TIDE_ENC.get(self.map_tide(tide), 1)
+
+        # 特徴量ベクトル作成（6個の特徴量を事前確保バッファに上書き）
+        features = self._feat_buf
+        features[0, 0] = month            # 月
+        features[0, 1] = season_encoded   # 季節エンコード
+        features[0, 2] = weather_encoded  # 天気エンコード
+        features[0, 3] = water_temp       # 水温
+        features[0, 4] = tide_encoded     # 潮エンコード
+        features[0, 5] = visitors         # 来場者数
+
+        logger.info(f"Features created: {features}")
+
+        # 予測実行（AOTコンパイル版 → JITカーネル → sklearnの順に選択）
+        if self._fast_model is not None:
+            prediction = float(
+                self._fast_model.predict(treelite_runtime.DMatrix(features))[0]
+            )
+        elif self._forest is not None:
+            # 量子化済みint16特徴量で走査（水温のみ×10して整数化）
+            q = self._feat_q
+            q[0] = month
+            q[1] = season_encoded
+            q[2] = weather_encoded
+            q[3] = int(round(water_temp * 10))
+            q[4] = tide_encoded
+            q[5] = visitors
+            prediction = _predict_forest(q, *self._forest)
+        else:
+            prediction = self.model.predict(features)[0]
+
+        # 予測値を整数に丸める（釣果数なので）
+        predicted_catch = max(0, int(round(prediction)))
+
+        # 信頼度計算（簡易版）
+        confidence = self._calculate_confidence(features, prediction)
+
+        # 推奨条件分析
+        recommendations = tuple(self._get_recommendations(features, prediction))
+
+        return predicted_catch, confidence, recommendations, season, weekday_type
+
     def predict_aji(self, date: str, weather: str, visitors: int, water_temp: float, tide: str) -> Dict[str, Any]:
         """アジ釣果を予測"""
         try:
@@ -153,70 +395,21 @@ class FishingPredictor:
                     "success": False,
                     "error": "予測モデルが読み込まれていません"
                 }
-            
+
             logger.info(f"Starting prediction: date={date}, weather={weather}, visitors={visitors}, temp={water_temp}, tide={tide}")
-            
-            # 日付解析
-            date_obj = datetime.strptime(date, '%Y/%m/%d')
-            month = date_obj.month
-            weekday = date_obj.weekday()
-            
-            # 特徴量作成
-            season = self.get_season(month)
-            weekday_type = self.get_weekday_type(weekday)
-            weather_mapped = self.map_weather(weather)
-            tide_mapped = self.map_tide(tide)
-            
-            # 季節エンコーディング
-            season_encoding = {
-                'spring': 0, 'summer': 1, 'autumn': 2, 'winter': 3
-            }
-            season_encoded = season_encoding.get(season, 1)
-            
-            # 天気エンコーディング
-            weather_encoding = {
-                'sunny': 0, 'cloudy': 1, 'rainy': 2, 'snowy': 3
-            }
-            weather_encoded = weather_encoding.get(weather_mapped, 1)
-            
-            # 潮エンコーディング
-            tide_encoding = {
-                'spring': 0, 'medium': 1, 'neap': 2, 'long': 3, 'young': 4
-            }
-            tide_encoded = tide_encoding.get(tide_mapped, 1)
-            
-            # 特徴量ベクトル作成（6個の特徴量）
-            features = np.array([[
-                month,           # 月
-                season_encoded,  # 季節エンコード
-                weather_encoded, # 天気エンコード
-                water_temp,      # 水温
-                tide_encoded,    # 潮エンコード
-                visitors         # 来場者数
-            ]])
-            
-            logger.info(f"Features created: {features}")
-            
-            # 予測実行
-            prediction = self.model.predict(features)[0]
-            
-            # 予測値を整数に丸める（釣果数なので）
-            predicted_catch = max(0, int(round(prediction)))
-            
-            # 信頼度計算（簡易版）
-            confidence = self._calculate_confidence(features, prediction)
-            
-            # 推奨条件分析
-            recommendations = self._get_recommendations(features, prediction)
-            
+
+            # メモ化された予測コアを呼び出し（キーは5つの入力値）
+            predicted_catch, confidence, recommendations, season, weekday_type = \
+                self._predict_cached(date, weather, int(visitors), float(water_temp), tide)
+
             logger.info(f"Prediction successful: {predicted_catch} fish")
-            
+
             return {
                 "success": True,
                 "prediction": {
                     "catch_count": predicted_catch,
                     "confidence": confidence,
-                    "recommendations": recommendations,
+                    "recommendations": list(recommendations),
                     "input_conditions": {
                         "date": date,
                         "weather": weather,
@@ -228,7 +421,7 @@ class FishingPredictor:
                     }
                 }
             }
-            
+
         except Exception as e:
             logger.error(f"Prediction error: {e}")
             return {
@@ -248,37 +441,20 @@ class FishingPredictor:
             return "Low"
     
     def _get_recommendations(self, features: np.ndarray, prediction: float) -> list:
-        """推奨条件を分析"""
-        recommendations = []
-        
-        # 特徴量から値を取得
-        month, season_encoded, weather_encoded, water_temp, tide_encoded, visitors = features[0]
-        
-        # 水温に基づく推奨
-        if water_temp < 15:
-            recommendations.append("水温が低めです。深場を狙うことをお勧めします。")
-        elif water_temp > 25:
-            recommendations.append("水温が高めです。朝夕の時間帯が狙い目です。")
-        else:
-            recommendations.append("水温は適温範囲です。")
-        
-        # 潮回りに基づく推奨
-        if tide_encoded == 0:  # 大潮
-            recommendations.append("大潮で潮の流れが強い日です。活性が期待できます。")
-        elif tide_encoded == 2:  # 小潮
-            recommendations.append("小潮で潮の動きが少ない日です。静かなポイントを狙いましょう。")
-        
-        # 来場者数に基づく推奨
-        if visitors > 300:
-            recommendations.append("混雑が予想されます。早めの場所取りをお勧めします。")
-        elif visitors < 100:
-            recommendations.append("比較的空いている日です。ゆっくり釣りを楽しめそうです。")
-        
-        return recommendations
+        """推奨条件を分析（モジュール定数のルールテーブルを1周するだけ）"""
+        f = features[0]
+        return [msg for pred, msg in _RULES if pred(f)]
+
+@cache
+def get_predictor() -> FishingPredictor:
+    """共有FishingPredictorを取得（初回呼び出し時に生成・モデル読み込み）
+
+    import時にpickleロードを走らせないための遅延初期化。
+    予測を使わないハンドラのコールドスタートが軽くなる
+    """
+    return FishingPredictor()
 
-# グローバルインスタンス
-predictor = FishingPredictor()
 
 def predict_aji_catch(date: str, weather: str, visitors: int, water_temp: float, tide: str) -> Dict[str, Any]:
     """アジ釣果予測のメイン関数"""
-    return predictor.predict_aji(date, weather, visitors, water_temp, tide)
\ No newline at end of file
+    return get_predictor().predict_aji(date, weather, visitors, water_temp, tide)
\ No newline at end of file
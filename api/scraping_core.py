@@ -9,8 +9,15 @@ import time
 import os
 import re
 import csv
-import pandas as pd
-from datetime import datetime
+import io
+import gzip
+import json
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import lru_cache
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -29,14 +36,222 @@ except ImportError:
     print("⚠️ Google Sheets関連ライブラリが見つかりません。以下を実行してください：")
     print("pip install gspread google-auth google-auth-oauthlib google-auth-httplib2")
 
+# 釣果数セル（"10匹"等）から数値部分を取り出す（行ループ内で使うため事前コンパイル）
+_COUNT_RE = re.compile(r'(\d+)')
+
+# 環境情報チップ（"天気 : 晴れ / ..."形式）の項目名 → 出力キー
+_ENV_FIELDS = {'天気': '天気', '水温': '水温', '潮': '潮', '来場者数': '来場者数'}
+
+
+def _parse_env_chips(chip_texts):
+    """チップ文字列の並びを環境情報dictに変換
+
+    正規表現の選択マッチではなく、コロンで1回分割して項目名を
+    辞書引きする（チップあたりO(1)のディスパッチ）
+    """
+    env_data = {'天気': '', '水温': '', '潮': '', '来場者数': ''}
+    for text in chip_texts:
+        parts = text.split(':', 1)
+        if len(parts) != 2:
+            continue
+        prefix = parts[0].strip()
+        if prefix in _ENV_FIELDS:
+            env_data[_ENV_FIELDS[prefix]] = parts[1].split('/')[0].strip()
+    return env_data
+
+# 検索結果ページの全itemを1回のJavaScript実行で収集するスクリプト
+# （item数×セレクタ数ぶんのWebDriver往復を1往復に畳む。パースはPython側で行う）
+_JS_EXTRACT_ITEMS = """
+return Array.from(document.querySelectorAll('div.searched-item')).map(function(item) {
+    var rows = [];
+    item.querySelectorAll('table.fish-list-tabel tbody tr').forEach(function(tr) {
+        if (tr.className.indexOf('sp-place') !== -1) return;
+        var cells = tr.querySelectorAll('td');
+        if (cells.length >= 4) {
+            rows.push([cells[0].innerText, cells[1].innerText,
+                       cells[2].innerText, cells[3].innerText]);
+        }
+    });
+    var sentence = item.querySelector('div.sentence');
+    return {
+        date: item.innerText.split('\\n')[0],
+        chips: Array.from(item.querySelectorAll('span.status-chip'))
+                    .map(function(e) { return e.textContent; }),
+        rows: rows,
+        comment: sentence ? sentence.innerText : ''
+    };
+});
+"""
+
+
+# 抽出済み月次データのディスクキャッシュ保存先
+# （同じ月の再実行・バックフィルでChrome起動とページ取得を丸ごと省く）
+_SCRAPE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'honmoku_scrape_cache')
+
+
+def _scrape_cache_path(target_year_month):
+    """月次データキャッシュのファイルパスを取得"""
+    return os.path.join(_SCRAPE_CACHE_DIR, f'{target_year_month}.json')
+
+
+def _scrape_cache_read(target_year_month, current_ttl_sec=900):
+    """抽出済み月次データのキャッシュを読み込む
+
+    過去月の釣果ページは内容が変わらないため無期限に有効。
+    当月だけは新しい日が追加されるためTTL（既定15分）付きで返す。
+
+    Returns:
+        tuple: (釣果データlist, コメントデータlist) / キャッシュなしはNone
+    """
+    try:
+        path = _scrape_cache_path(target_year_month)
+        if not os.path.exists(path):
+            return None
+
+        if target_year_month >= datetime.now().strftime('%Y%m'):
+            if time.time() - os.path.getmtime(path) > current_ttl_sec:
+                return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['fishing'], cached['comment']
+
+    except Exception as e:
+        print(f"⚠️ 月次キャッシュ読み込み失敗（通常スクレイピングにフォールバック）: {e}")
+        return None
+
+
+def _scrape_cache_write(target_year_month, fishing_data, comment_data):
+    """抽出済み月次データをキャッシュに保存"""
+    try:
+        os.makedirs(_SCRAPE_CACHE_DIR, exist_ok=True)
+        with open(_scrape_cache_path(target_year_month), 'w', encoding='utf-8') as f:
+            json.dump({'fishing': fishing_data, 'comment': comment_data},
+                      f, ensure_ascii=False)
+    except Exception as e:
+        print(f"⚠️ 月次キャッシュ保存失敗: {e}")
+
+
+# 前回実行時の月次データ内容ハッシュの保存先
+# （cron等での定期実行時、内容が変わっていなければSheets投入まで含めて省く）
+_SCRAPE_STATE_DIR = '.scrape_state'
+
+
+def _state_hash_path(target_year_month):
+    """内容ハッシュファイルのパスを取得"""
+    return os.path.join(_SCRAPE_STATE_DIR, f'{target_year_month}.hash')
+
+
+def _read_state_hash(target_year_month):
+    """前回実行時の内容ハッシュを読み込む（なければNone）"""
+    try:
+        with open(_state_hash_path(target_year_month), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_state_hash(target_year_month, digest):
+    """今回の内容ハッシュを保存する"""
+    try:
+        os.makedirs(_SCRAPE_STATE_DIR, exist_ok=True)
+        with open(_state_hash_path(target_year_month), 'w') as f:
+            f.write(digest)
+    except OSError as e:
+        print(f"⚠️ 内容ハッシュ保存失敗: {e}")
+
+
+def _content_hash(fishing_data, comment_data):
+    """抽出済み月次データの内容ハッシュを計算"""
+    payload = json.dumps({'f': fishing_data, 'c': comment_data},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _remove_uploaded_csv(result):
+    """Sheets投入済みのCSV（と同一内容スキップ用sentinel）を削除する
+
+    Sheets投入が成功していればCSVは中間ファイルでしかないため、
+    --keep-csv指定がない限り残さない。削除後はresultのパスを
+    Noneにして呼び出し側の表示も自然にスキップされるようにする。
+    """
+    for key in ('fishing_csv', 'comment_csv'):
+        path = result.get(key)
+        if not path:
+            continue
+        for p in (path, path + '.md5'):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        result[key] = None
+
+
+def build_chrome_options(headless=True):
+    """スクレイピング用ChromeOptionsを構築
+
+    画像・拡張機能・バックグラウンド通信を止めてページあたりの
+    転送バイトとレンダラの仕事を削る。page_load_strategy='eager'で
+    driver.getはloadイベントではなくDOMContentLoadedで返る
+    （要素待機は全てWebDriverWaitで行うため十分）。
+    """
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    # 並列実行時のプロファイル競合を避けるためワーカー毎に一時ディレクトリを使う
+    options.add_argument(f'--user-data-dir={tempfile.mkdtemp(prefix="chrome-profile-")}')
+
+    # DOMテキストしか使わないため画像・通知・拡張機能を読み込まない
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2
+    })
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-sync')
+    options.add_argument('--metrics-recording-only')
+    options.add_argument('--mute-audio')
+    options.add_argument('--disable-features=Translate,TranslateUI')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+
+    options.page_load_strategy = 'eager'
+    return options
+
+
+# CDPレベルでブロックするURLパターン
+# （Blinkの画像無効化に加えて、フォント・解析タグ・動画の
+# リクエスト自体をネットワーク層で落とす）
+_BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp',
+    '*.woff', '*.woff2', '*.ttf', '*.mp4',
+    '*google-analytics*', '*googletagmanager*', '*doubleclick*',
+]
+
+
 class ScrapingCore:
     """スクレイピング共通処理クラス"""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, legacy_extract=False, nav_timeout=15,
+                 block_assets=True):
         """初期化"""
         self.driver = None
         self.target_url = "https://yokohama-fishingpiers.jp/honmoku/fishing-history"
         self.headless = headless
+        # 一括JS抽出の検証用に要素単位の旧抽出パスを強制するフラグ
+        self.legacy_extract = legacy_extract
+        # ページ遷移・検索結果待ちのタイムアウト（秒）
+        self.nav_timeout = nav_timeout
+        # 明示的待機に費やした累計時間（cleanup時に1回だけ報告）
+        self.wait_time_total = 0.0
+        # CDPで画像・フォント・解析タグのリクエストを落とすか
+        self.block_assets = block_assets
         
         # 環境判定（ローカル or Vercel）
         self.is_vercel = os.environ.get('VERCEL') == '1'
@@ -54,17 +269,9 @@ class ScrapingCore:
         """WebDriver初期化（環境自動判定）"""
         try:
             print("🔧 Chrome WebDriverを準備中...")
-            
-            options = Options()
-            if self.headless:
-                options.add_argument('--headless')
-            
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
+
+            options = build_chrome_options(headless=self.headless)
+
             if self.is_vercel:
                 # Vercel環境: 自動WebDriver
                 self.driver = webdriver.Chrome(options=options)
@@ -74,7 +281,20 @@ class ScrapingCore:
                 service = Service(executable_path=self.chromedriver_path)
                 self.driver = webdriver.Chrome(service=service, options=options)
             
-            self.driver.implicitly_wait(10)
+            # implicitly_waitはWebDriverWaitと重複し、存在しない要素の検索を
+            # 一律に遅くするため使わない（待機はすべて明示的に行う）
+
+            if self.block_assets:
+                # Blinkフラグで落ちない分（フォント・解析タグ等）も
+                # ネットワーク層でブロックして転送バイトを削る
+                try:
+                    self.driver.execute_cdp_cmd('Network.enable', {})
+                    self.driver.execute_cdp_cmd('Network.setBlockedURLs',
+                                                {'urls': _BLOCKED_URL_PATTERNS})
+                    print(f"🚫 アセットブロック有効（{len(_BLOCKED_URL_PATTERNS)}パターン）")
+                except Exception as e:
+                    print(f"⚠️ アセットブロック設定失敗（ブロックなしで続行）: {e}")
+
             print("✅ WebDriver初期化完了")
             return True
             
@@ -82,35 +302,65 @@ class ScrapingCore:
             print(f"❌ WebDriver初期化エラー: {e}")
             return False
     
-    def scrape_period(self, target_year_month):
-        """指定年月の釣果データをスクレイピング実行"""
+    def scrape_period(self, target_year_month, use_cache=True, cache_ttl_sec=900, force=False):
+        """指定年月の釣果データをスクレイピング実行
+
+        Args:
+            use_cache (bool): 抽出済み月次データのディスクキャッシュを使うか
+            cache_ttl_sec (int): 当月キャッシュの有効期間（秒）
+            force (bool): 前回実行から内容が同じでも全処理を実行するか
+        """
         try:
             # 年月解析
             year = int(target_year_month[:4])
             month = int(target_year_month[4:])
-            
+
             print(f"🎣 釣果データ抽出開始: {year}年{month:02d}月")
-            
+
             print(f"🗓️ {year}年{month:02d}月のデータを処理中...")
-            
-            # 検索フォームで年月を設定
-            if not self._set_search_period(year, month):
-                print(f"❌ {year}年{month:02d}月の検索設定に失敗")
-                return {
-                    'success': False,
-                    'error': f'{year}年{month:02d}月の検索設定に失敗'
-                }
-            
-            # 検索実行
-            if not self._execute_search():
-                print(f"❌ {year}年{month:02d}月の検索実行に失敗")
+
+            cached = _scrape_cache_read(target_year_month, cache_ttl_sec) if use_cache else None
+            if cached is not None:
+                # キャッシュヒット時はブラウザ操作を丸ごとスキップ
+                print(f"✅ {year}年{month:02d}月の抽出済みキャッシュを使用")
+                fishing_data, comment_data = cached
+            else:
+                # 検索フォームで年月を設定
+                if not self._set_search_period(year, month):
+                    print(f"❌ {year}年{month:02d}月の検索設定に失敗")
+                    return {
+                        'success': False,
+                        'error': f'{year}年{month:02d}月の検索設定に失敗'
+                    }
+
+                # 検索実行
+                if not self._execute_search():
+                    print(f"❌ {year}年{month:02d}月の検索実行に失敗")
+                    return {
+                        'success': False,
+                        'error': f'{year}年{month:02d}月の検索実行に失敗'
+                    }
+
+                # 検索結果からデータ抽出（釣果とコメントを分離）
+                fishing_data, comment_data = self._extract_monthly_data(year, month)
+
+                if use_cache and fishing_data:
+                    _scrape_cache_write(target_year_month, fishing_data, comment_data)
+
+            # 前回実行から内容が変わっていなければCSV出力もSheets投入も不要
+            # （cronでの定期実行時、ほとんどの回をここで打ち切れる）
+            digest = _content_hash(fishing_data, comment_data)
+            if not force and digest == _read_state_hash(target_year_month):
+                print(f"⏭️ {year}年{month:02d}月 - 前回実行から変化なし（--forceで強制実行）")
                 return {
-                    'success': False,
-                    'error': f'{year}年{month:02d}月の検索実行に失敗'
+                    'success': True,
+                    'unchanged': True,
+                    'total_records': len(fishing_data),
+                    'fishing_csv': None,
+                    'comment_csv': None,
+                    'period': f"{year}年{month:02d}月"
                 }
-            
-            # 検索結果からデータ抽出（釣果とコメントを分離）
-            fishing_data, comment_data = self._extract_monthly_data(year, month)
+
             if fishing_data:
                 print(f"✅ {year}年{month:02d}月完了 - 釣果: {len(fishing_data)}件, コメント: {len(comment_data)}件")
                 
@@ -118,23 +368,27 @@ class ScrapingCore:
                 fishing_csv = f"fishing_results_{target_year_month}.csv"
                 comment_csv = f"daily_comments_{target_year_month}.csv"
                 
-                # 釣果データCSV
+                # 釣果データCSV（gzip圧縮後のファイル名が返る）
                 fishing_headers = ['日付', '天気', '水温', '潮', '来場者数', '魚種', '釣果数', 'サイズ', '釣り場']
-                self._save_to_csv(fishing_data, fishing_headers, fishing_csv)
-                
+                fishing_csv = self._save_to_csv(fishing_data, fishing_headers, fishing_csv)
+
                 # コメントデータCSV
                 comment_headers = ['日付', '天気', '水温', '潮', '来場者数', 'コメント']
-                self._save_to_csv(comment_data, comment_headers, comment_csv)
+                comment_csv = self._save_to_csv(comment_data, comment_headers, comment_csv)
                 
                 print(f"💾 釣果データCSV出力完了: {fishing_csv}")
                 print(f"💾 コメントCSV出力完了: {comment_csv}")
-                
+
+                # ハッシュの保存はSheets投入成功後（run_scraping側）に行う。
+                # ここで保存すると投入失敗時も次回が「変化なし」でスキップされ、
+                # データが永久に未投入のままになる
                 return {
                     'success': True,
                     'total_records': len(fishing_data),
                     'fishing_csv': fishing_csv,
                     'comment_csv': comment_csv,
-                    'period': f"{year}年{month:02d}月"
+                    'period': f"{year}年{month:02d}月",
+                    'content_hash': digest
                 }
             else:
                 print(f"⚠️ {year}年{month:02d}月 - データなし")
@@ -143,7 +397,8 @@ class ScrapingCore:
                     'total_records': 0,
                     'fishing_csv': None,
                     'comment_csv': None,
-                    'period': f"{year}年{month:02d}月"
+                    'period': f"{year}年{month:02d}月",
+                    'content_hash': digest
                 }
             
         except Exception as e:
@@ -153,16 +408,25 @@ class ScrapingCore:
                 'error': str(e)
             }
     
+    def _wait_until(self, condition, timeout=None, poll_frequency=0.1):
+        """明示的待機を実行し、待機に使った時間を累計に加算する"""
+        if timeout is None:
+            timeout = self.nav_timeout
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout,
+                                 poll_frequency=poll_frequency).until(condition)
+        finally:
+            self.wait_time_total += time.perf_counter() - start
+
     def access_site(self):
         """サイトアクセス"""
         try:
             print(f"🌐 サイトアクセス中: {self.target_url}")
             self.driver.get(self.target_url)
-            
+
             # ページロード完了を待機
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            self._wait_until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             
             title = self.driver.title
             current_url = self.driver.current_url
@@ -181,26 +445,31 @@ class ScrapingCore:
         """検索フォームで年月を設定"""
         try:
             print(f"📅 検索期間設定: {year}年{month:02d}月")
-            
-            # 年選択
+
+            # 年選択（固定sleepではなく条件成立の瞬間まで0.1秒間隔でポーリングする）
+            year_xpath = f"//div[contains(@class, 'v-list-item') and text()='{year}']"
             year_dropdown = self.driver.find_element(By.CSS_SELECTOR, ".v-select__menu-icon")
             year_dropdown.click()
-            time.sleep(1)
-            
-            year_option = self.driver.find_element(By.XPATH, f"//div[contains(@class, 'v-list-item') and text()='{year}']")
+
+            year_option = self._wait_until(
+                EC.element_to_be_clickable((By.XPATH, year_xpath)), timeout=5)
             year_option.click()
-            time.sleep(1)
-            
+            # ドロップダウンが閉じるのを待ってから次の操作に進む
+            self._wait_until(
+                EC.invisibility_of_element_located((By.XPATH, year_xpath)), timeout=5)
+
             # 月選択
+            month_str = f"{month:02d}"
+            month_xpath = f"//div[contains(@class, 'v-list-item') and text()='{month_str}']"
             month_dropdowns = self.driver.find_elements(By.CSS_SELECTOR, ".v-select__menu-icon")
             month_dropdowns[1].click()
-            time.sleep(1)
-            
-            month_str = f"{month:02d}"
-            month_option = self.driver.find_element(By.XPATH, f"//div[contains(@class, 'v-list-item') and text()='{month_str}']")
+
+            month_option = self._wait_until(
+                EC.element_to_be_clickable((By.XPATH, month_xpath)), timeout=5)
             month_option.click()
-            time.sleep(1)
-            
+            self._wait_until(
+                EC.invisibility_of_element_located((By.XPATH, month_xpath)), timeout=5)
+
             return True
             
         except Exception as e:
@@ -211,18 +480,20 @@ class ScrapingCore:
         """検索ボタンをクリックして結果を待機"""
         try:
             # 検索ボタンをクリック
-            search_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.fish-search-btn"))
-            )
+            search_button = self._wait_until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.fish-search-btn")),
+                timeout=10)
             search_button.click()
             print("🔍 検索実行中...")
-            
-            # 検索結果の出現を待機
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.searched-item"))
-            )
-            time.sleep(2)  # 追加待機
-            
+
+            # 検索結果の出現を待機（最初のitemの出現に加えて
+            # 日次詳細の中身が描画されるまで0.1秒間隔でポーリング）
+            self._wait_until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.searched-item")))
+            self._wait_until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "div.searched-item span.status-chip")))
+
             print("✅ 検索結果ロード完了")
             return True
             
@@ -238,7 +509,58 @@ class ScrapingCore:
         try:
             fishing_data_list = []  # 釣果データ用
             comment_data_list = []  # コメントデータ用
-            
+
+            # 検証用フラグ指定時は要素単位の旧抽出パスを使う
+            if self.legacy_extract:
+                return self._extract_monthly_data_dom(year, month)
+
+            # ページ全体を1回のexecute_scriptで収集
+            # （従来はitem毎に複数のfind_elementsでChromedriverと往復していた）
+            try:
+                items = self.driver.execute_script(_JS_EXTRACT_ITEMS)
+            except Exception as e:
+                print(f"⚠️ 一括抽出に失敗、要素単位の抽出にフォールバック: {e}")
+                return self._extract_monthly_data_dom(year, month)
+
+            for item in items:
+                date_text = item['date'].strip()
+
+                # 環境情報を抽出（共通）
+                env_data = _parse_env_chips(item['chips'])
+
+                base_data = {
+                    '日付': date_text,
+                    **env_data
+                }
+
+                # 釣果データ作成（各魚種ごとに行を作成、コメントは除外）
+                for cells in item['rows']:
+                    count_match = _COUNT_RE.search(cells[1])
+                    fishing_data_list.append({
+                        **base_data,
+                        '魚種': cells[0].strip(),
+                        '釣果数': count_match.group(1) if count_match else '0',
+                        'サイズ': cells[2].strip(),
+                        '釣り場': cells[3].strip()
+                    })
+
+                # コメントデータ作成（1日1行、コメントがある場合のみ）
+                comment = item['comment'].strip()
+                if comment:
+                    comment_data_list.append({**base_data, 'コメント': comment})
+
+            return fishing_data_list, comment_data_list
+
+        except Exception as e:
+            print(f"❌ 月次データ抽出エラー: {e}")
+            return [], []
+
+    def _extract_monthly_data_dom(self, year, month):
+        """月次データ抽出のフォールバック（要素単位のWebDriver API版）"""
+        try:
+            fishing_data_list = []  # 釣果データ用
+            comment_data_list = []  # コメントデータ用
+
             # searched-itemを取得
             searched_items = self.driver.find_elements(By.CSS_SELECTOR, "div.searched-item")
             
@@ -280,22 +602,15 @@ class ScrapingCore:
     def _extract_environment_data(self, item):
         """環境情報（天気、水温など）を抽出"""
         try:
-            env_data = {'天気': '', '水温': '', '潮': '', '来場者数': ''}
-            
-            status_chips = item.find_elements(By.CSS_SELECTOR, "span.status-chip")
-            
-            for chip in status_chips:
-                text = chip.text.strip()
-                if '天気 :' in text:
-                    env_data['天気'] = text.replace('天気 :', '').split('/')[0].strip()
-                elif '水温 :' in text:
-                    env_data['水温'] = text.replace('水温 :', '').split('/')[0].strip()
-                elif '潮 :' in text:
-                    env_data['潮'] = text.replace('潮 :', '').split('/')[0].strip()
-                elif '来場者数 :' in text:
-                    env_data['来場者数'] = text.replace('来場者数 :', '').split('/')[0].strip()
-            
-            return env_data
+            # チップのテキストをJavaScript1回でまとめて取得
+            # （チップ毎のSelenium往復とPython文字列操作の多段チェックをなくす）
+            chip_texts = self.driver.execute_script(
+                "return Array.from(arguments[0].querySelectorAll('span.status-chip'))"
+                ".map(e => e.textContent);",
+                item
+            )
+
+            return _parse_env_chips(chip_texts)
             
         except Exception as e:
             print(f"❌ 環境データ抽出エラー: {e}")
@@ -305,41 +620,38 @@ class ScrapingCore:
         """釣果テーブルからデータを抽出"""
         try:
             fishing_data = []
-            
-            # テーブルの行を取得
-            rows = item.find_elements(By.CSS_SELECTOR, "table.fish-list-tabel tbody tr")
-            
-            i = 0
-            while i < len(rows):
-                row = rows[i]
-                
-                # メインの釣果データ行
-                if not 'sp-place' in row.get_attribute('class'):
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) >= 4:
-                        # 魚種名
-                        fish_name = cells[0].text.strip()
-                        
-                        # 釣果数（正規表現で数値抽出）
-                        count_text = cells[1].text.strip()
-                        count_match = re.search(r'(\d+)', count_text)
-                        fish_count = count_match.group(1) if count_match else '0'
-                        
-                        # サイズ
-                        fish_size = cells[2].text.strip()
-                        
-                        # 釣り場（テキストをそのまま取得）
-                        fishing_area = cells[3].text.strip()
-                        
-                        fishing_data.append({
-                            '魚種': fish_name,
-                            '釣果数': fish_count,
-                            'サイズ': fish_size,
-                            '釣り場': fishing_area
-                        })
-                
-                i += 1
-            
+
+            # テーブルの行を取得（sp-place行はXPath側で除外し、
+            # 行毎のget_attribute('class')往復をなくす）
+            rows = item.find_elements(
+                By.XPATH,
+                ".//table[contains(@class,'fish-list-tabel')]/tbody/tr[not(contains(@class,'sp-place'))]"
+            )
+
+            for row in rows:
+                cells = row.find_elements(By.TAG_NAME, "td")
+                if len(cells) >= 4:
+                    # 魚種名
+                    fish_name = cells[0].text.strip()
+
+                    # 釣果数（正規表現で数値抽出）
+                    count_text = cells[1].text.strip()
+                    count_match = _COUNT_RE.search(count_text)
+                    fish_count = count_match.group(1) if count_match else '0'
+
+                    # サイズ
+                    fish_size = cells[2].text.strip()
+
+                    # 釣り場（テキストをそのまま取得）
+                    fishing_area = cells[3].text.strip()
+
+                    fishing_data.append({
+                        '魚種': fish_name,
+                        '釣果数': fish_count,
+                        'サイズ': fish_size,
+                        '釣り場': fishing_area
+                    })
+
             return fishing_data
             
         except Exception as e:
@@ -358,21 +670,53 @@ class ScrapingCore:
             return ""
 
     def _save_to_csv(self, data, headers, filename):
-        """データをCSVファイルに保存"""
+        """データをgzip圧縮CSVに保存（内容が前回と同じなら書き込みスキップ）
+
+        Returns:
+            str: 実際に書き出した（または既存の）ファイル名。失敗時はNone
+        """
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-                writer.writeheader()
-                writer.writerows(data)
-            print(f"💾 {len(data)}件のデータを{filename}に保存しました")
+            gz_filename = filename + '.gz'
+            sentinel = gz_filename + '.md5'
+
+            # 抽出済みdictをそのままcsvモジュールでストリーム書き出し
+            # （数百行のためにDataFrameを組み立てる必要はなく、
+            # このパスからpandas importも不要になる）
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=headers,
+                                    extrasaction='ignore', lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(data)
+            csv_text = buf.getvalue()
+
+            # 再スクレイピングで内容が変わっていなければ書き直さない
+            digest = hashlib.md5(csv_text.encode('utf-8')).hexdigest()
+            if os.path.exists(gz_filename) and os.path.exists(sentinel):
+                with open(sentinel, 'r') as f:
+                    if f.read().strip() == digest:
+                        print(f"⏭️ {gz_filename}は前回と同一内容のため書き込みスキップ")
+                        return gz_filename
+
+            # 低圧縮レベルのgzipで書き出し（プレーンCSV比で約1/5のサイズ）
+            with gzip.open(gz_filename, 'wt', compresslevel=1, encoding='utf-8') as f:
+                f.write(csv_text)
+            with open(sentinel, 'w') as f:
+                f.write(digest)
+
+            print(f"💾 {len(data)}件のデータを{gz_filename}に保存しました")
+            return gz_filename
+
         except Exception as e:
             print(f"❌ CSV保存エラー: {e}")
+            return None
     
     def cleanup(self):
         """クリーンアップ"""
         try:
             if self.driver:
                 self.driver.quit()
+                # 待機時間の増加（セレクタ変更等による劣化）に気づけるよう1回だけ報告
+                print(f"⏱️ 明示的待機の累計: {self.wait_time_total:.1f}秒")
                 print("✅ WebDriverクリーンアップ完了")
         except Exception as e:
             print(f"❌ クリーンアップエラー: {e}")
@@ -381,35 +725,115 @@ class ScrapingCore:
 # Google Sheets投入機能（追記機能対応版）
 # =============================================================================
 
+# プロセス内で使い回すgspreadクライアント
+# （認証とトークン取得は重いので複数月処理でも1回だけにする）
+_SHEETS_CLIENT = None
+
+# 直近の認証情報（アクセストークンの永続化に使う）
+_SHEETS_CREDENTIALS = None
+
+# アクセストークンの永続化先
+# （cronの短い間隔での再起動時、OAuth2のJWT交換を省く）
+_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'honmoku', 'token.json')
+
+
+def _load_cached_token(credentials):
+    """前回実行時のアクセストークンが有効期限内なら復元する
+
+    サービスアカウントのトークン取得はRSA署名＋HTTPS往復で
+    200〜500msかかるため、期限に5分以上余裕があれば再利用する。
+    """
+    try:
+        with open(_TOKEN_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+        expiry = datetime.fromisoformat(cached['expiry'])
+        if expiry - datetime.utcnow() > timedelta(minutes=5):
+            credentials.token = cached['token']
+            credentials.expiry = expiry
+            print("🔑 キャッシュ済みアクセストークンを再利用")
+    except (OSError, KeyError, ValueError):
+        pass
+
+
+def _save_cached_token(credentials):
+    """取得済みアクセストークンを次回実行のために保存する"""
+    try:
+        if credentials is None or not credentials.token or not credentials.expiry:
+            return
+        os.makedirs(os.path.dirname(_TOKEN_CACHE_PATH), exist_ok=True)
+        with open(_TOKEN_CACHE_PATH, 'w') as f:
+            json.dump({'token': credentials.token,
+                       'expiry': credentials.expiry.isoformat()}, f)
+        # Bearerトークンを含むため所有者以外は読めないようにする
+        os.chmod(_TOKEN_CACHE_PATH, 0o600)
+    except OSError as e:
+        print(f"⚠️ アクセストークン保存失敗: {e}")
+
 def setup_google_sheets_client():
-    """Google Sheets クライアント初期化"""
+    """Google Sheets クライアント初期化（プロセス内キャッシュ付き）"""
+    global _SHEETS_CLIENT, _SHEETS_CREDENTIALS
     try:
         if not GOOGLE_SHEETS_AVAILABLE:
             return None, "Google Sheetsライブラリが利用できません"
-        
+
+        if _SHEETS_CLIENT is not None:
+            return _SHEETS_CLIENT, None
+
         # 認証ファイルパス
         credentials_path = r"C:\Users\kataoka.akihito\Documents\MyPython\env313\choka-389510-1103575d64ab.json"
-        
+
         if not os.path.exists(credentials_path):
             return None, f"認証ファイルが見つかりません: {credentials_path}"
-        
+
         # Google Sheets API のスコープ
         scope = [
             'https://spreadsheets.google.com/feeds',
             'https://www.googleapis.com/auth/drive'
         ]
-        
+
         # サービスアカウント認証
         credentials = Credentials.from_service_account_file(credentials_path, scopes=scope)
-        client = gspread.authorize(credentials)
-        
+
+        # 前回実行時のアクセストークンが生きていればJWT交換を省く
+        _load_cached_token(credentials)
+
+        # コネクションプール＋リトライ付きのセッションを自前で用意して渡す。
+        # バッチ追記はgoogleapis.comへ同一ホストのリクエストを繰り返すため、
+        # keep-aliveでTLSハンドシェイクを初回の1回に抑えられる。
+        # 429/5xxはバックオフ付きで自動リトライする。
+        try:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            from google.auth.transport.requests import AuthorizedSession
+
+            session = AuthorizedSession(credentials)
+            session.mount('https://', HTTPAdapter(
+                max_retries=Retry(total=3, backoff_factor=0.3,
+                                  status_forcelist=[429, 500, 502, 503, 504]),
+                pool_connections=10,
+                pool_maxsize=20
+            ))
+            client = gspread.Client(auth=credentials, session=session)
+        except Exception as e:
+            # セッション構築に失敗してもデフォルト構成で動作は継続できる
+            print(f"⚠️ プール付きHTTPセッションの構築に失敗、デフォルト構成で続行: {e}")
+            client = gspread.authorize(credentials)
+
+        _SHEETS_CLIENT = client
+        _SHEETS_CREDENTIALS = credentials
         return client, None
-        
+
     except Exception as e:
         return None, f"Google Sheetsクライアント初期化エラー: {e}"
 
+@lru_cache(maxsize=4096)
 def parse_date_for_sort(date_str):
-    """日付文字列をソート用の日付オブジェクトに変換"""
+    """日付文字列をソート用の日付オブジェクトに変換
+
+    同じ日付文字列が繰り返し渡されるためメモ化する。
+    一括処理はparse_dates_for_sortが担うので、こちらは単発呼び出し用の
+    低コストな保険として残している。
+    """
     try:
         # "2025/07/28(月)" -> "2025/07/28"
         date_part = date_str.split('(')[0]
@@ -418,74 +842,258 @@ def parse_date_for_sort(date_str):
         # パースできない場合は最小日付を返す
         return datetime(1900, 1, 1)
 
-def append_data_to_worksheet(worksheet, new_df, sheet_type="データ"):
-    """ワークシートにデータを追記（重複チェック付き）"""
+def parse_dates_for_sort(date_series):
+    """日付列をまとめてソート用のdatetime64列に変換
+
+    日付部分はYYYY/MM/DDの固定10文字なので、スライスで切り出して
+    '/'→'-'に置換し、numpyのdatetime64へ直接キャストする
+    （strptimeはもちろんpd.to_datetimeの書式処理も通らない最速経路）。
+    不正な値が混ざっていた場合のみto_datetimeのフォールバックで
+    パースし、parse_date_for_sortと同様に最小日付扱いにする。
+    """
+    import pandas as pd
+
+    date_part = date_series.astype(str).str[:10].str.replace('/', '-', regex=False)
     try:
+        return pd.Series(
+            date_part.to_numpy().astype('datetime64[D]'),
+            index=date_series.index
+        )
+    except ValueError:
+        parsed = pd.to_datetime(date_part, format='%Y-%m-%d', errors='coerce', cache=True)
+        return parsed.fillna(pd.Timestamp(1900, 1, 1))
+
+def append_data_to_worksheet(worksheet, new_df, sheet_type="データ", resort=False,
+                             existing_df=None):
+    """ワークシートにデータを追記（重複チェック付き）
+
+    通常は新規行だけをappend_rowsで送信し、蓄積分を含むシート全体の
+    再アップロード（clear + update）は行わない。転送バイト数が
+    新規行分だけになり、Sheets APIの書き込みクォータにも優しい。
+    行の並びを日付順に整え直したいメンテナンス時のみresort=Trueで
+    従来の全体書き換えを実行する。
+
+    呼び出し側が既にシート内容を取得済みの場合はexisting_dfで渡すと
+    重複チェック用の再取得（全シート読み込み1回）を省略できる。
+    """
+    try:
+        import pandas as pd
+
+        # 追記対象が空ならAPIを一切呼ばずに終了
+        if new_df is None or len(new_df) == 0:
+            print(f"⚠️ 追記対象の{sheet_type}がありません")
+            return 0
+
         print(f"📋 {sheet_type}の既存データをチェック中...")
-        
-        # 既存データを取得
-        existing_data = worksheet.get_all_records()
-        
-        if existing_data:
-            existing_df = pd.DataFrame(existing_data)
+
+        # 既存データを取得（呼び出し側から渡されていれば再取得しない）
+        if existing_df is None:
+            existing_data = worksheet.get_all_records()
+            existing_df = pd.DataFrame(existing_data) if existing_data else None
+
+        if existing_df is not None and len(existing_df) > 0:
             print(f"📊 既存{sheet_type}: {len(existing_df)}行")
-            
+
             # 重複チェック（日付ベース）
             if sheet_type == "釣果データ":
                 # 釣果データの場合: 日付+魚種で重複チェック
-                existing_keys = set(
-                    existing_df['日付'].astype(str) + '_' + existing_df['魚種'].astype(str)
-                )
-                new_keys = new_df['日付'].astype(str) + '_' + new_df['魚種'].astype(str)
-                mask = ~new_keys.isin(existing_keys)
+                key_cols = ['日付', '魚種']
             else:
                 # コメントデータの場合: 日付のみで重複チェック
-                existing_keys = set(existing_df['日付'].astype(str))
-                new_keys = new_df['日付'].astype(str)
-                mask = ~new_keys.isin(existing_keys)
-            
-            # 新規データのみを抽出
-            unique_new_df = new_df[mask].copy()
-            
+                key_cols = ['日付']
+
+            # キー列をマージして既存シートに無い行だけを抽出
+            # （文字列連結キーのset構築より中間オブジェクトが少ない）
+            merged = new_df.merge(
+                existing_df[key_cols].astype(str).drop_duplicates(),
+                on=key_cols,
+                how='left',
+                indicator=True,
+                validate='many_to_one'
+            )
+            unique_new_df = (
+                merged[merged['_merge'] == 'left_only']
+                .drop(columns='_merge')
+                .copy()
+            )
+
             if len(unique_new_df) == 0:
                 print(f"⚠️ 新規{sheet_type}なし（すべて既存データと重複）")
                 return 0
-            
+
             print(f"✅ 新規{sheet_type}: {len(unique_new_df)}行（重複除外: {len(new_df) - len(unique_new_df)}行）")
-            
-            # 既存データと新規データを結合
-            combined_df = pd.concat([existing_df, unique_new_df], ignore_index=True)
+
+            if not resort:
+                # 新規行のみを末尾に追記（既存行はシート上に置いたまま）
+                print(f"📤 {sheet_type}の新規行を追記中...")
+                worksheet.append_rows(
+                    unique_new_df.values.tolist(),
+                    value_input_option='USER_ENTERED',
+                    insert_data_option='INSERT_ROWS'
+                )
+                print(f"✅ {sheet_type}追記完了: 新規追加{len(unique_new_df)}行")
+                return len(unique_new_df)
+
+            # resort指定時でも、新規行がすべて既存の最終日付以降なら
+            # 末尾追記で既に日付順が保たれるためシート側ソートも不要
+            existing_dates = parse_dates_for_sort(existing_df['日付'])
+            new_dates = parse_dates_for_sort(unique_new_df['日付'])
+            sorted_new_df = unique_new_df.iloc[new_dates.argsort(kind='stable')]
+            in_order = new_dates.min() >= existing_dates.max()
+
+            if in_order:
+                print(f"📤 {sheet_type}は時系列順の追記のみで整合（ソートスキップ）...")
+
+            worksheet.append_rows(
+                sorted_new_df.values.tolist(),
+                value_input_option='USER_ENTERED',
+                insert_data_option='INSERT_ROWS'
+            )
+
+            if not in_order:
+                # 既存より古い日付が混ざる場合はシート側でソートさせる。
+                # 全行の再アップロード（clear + update）ではなく、
+                # batchUpdateのSortRangeRequest 1件で済ませる。
+                # 日付はYYYY/MM/DD(曜)の固定書式なので文字列昇順 = 時系列順。
+                print(f"🔄 {sheet_type}をシート側で日付順にソート中...")
+                date_col_index = list(new_df.columns).index('日付')
+                worksheet.spreadsheet.batch_update({
+                    'requests': [{
+                        'sortRange': {
+                            'range': {
+                                'sheetId': worksheet.id,
+                                'startRowIndex': 1  # ヘッダー行を除く
+                            },
+                            'sortSpecs': [{
+                                'dimensionIndex': date_col_index,
+                                'sortOrder': 'ASCENDING'
+                            }]
+                        }
+                    }]
+                })
+
+            print(f"✅ {sheet_type}追記完了: 新規追加{len(unique_new_df)}行")
+            return len(unique_new_df)
         else:
             print(f"📝 {sheet_type}シートが空 - 全データを追加")
-            combined_df = new_df.copy()
-            unique_new_df = new_df.copy()
-        
-        # 日付順でソート
-        print(f"🔄 {sheet_type}を日付順でソート中...")
-        combined_df['_sort_date'] = combined_df['日付'].apply(parse_date_for_sort)
-        combined_df = combined_df.sort_values('_sort_date').drop('_sort_date', axis=1)
-        
-        # シート全体を更新（ヘッダー含む）
-        print(f"📤 {sheet_type}シート全体を更新中...")
-        worksheet.clear()
-        
-        # ヘッダー + データを一括投入
-        headers = combined_df.columns.tolist()
-        all_data = [headers] + combined_df.values.tolist()
-        
-        worksheet.update('A1', all_data, value_input_option='USER_ENTERED')
-        print(f"✅ {sheet_type}更新完了: 総計{len(combined_df)}行（新規追加: {len(unique_new_df)}行）")
-        
-        return len(unique_new_df)
-        
+
+            if resort:
+                # 空シートへの投入時は手元で日付順に並べてから送る
+                new_dates = parse_dates_for_sort(new_df['日付'])
+                new_df = new_df.iloc[new_dates.argsort(kind='stable')]
+
+            # ヘッダー1行だけをupdateし、データはappend_rowsで投入
+            worksheet.update('A1', [new_df.columns.tolist()], value_input_option='USER_ENTERED')
+            worksheet.append_rows(
+                new_df.values.tolist(),
+                value_input_option='USER_ENTERED',
+                insert_data_option='INSERT_ROWS'
+            )
+            print(f"✅ {sheet_type}投入完了: {len(new_df)}行")
+            return len(new_df)
+
     except Exception as e:
         print(f"❌ {sheet_type}追記エラー: {e}")
         import traceback
         traceback.print_exc()
         return 0
 
-def upload_to_google_sheets_func(fishing_csv_filename, comment_csv_filename):
-    """Google Sheets投入（追記機能対応版）"""
+def append_csv_to_worksheet(worksheet, csv_path, sheet_type="データ", chunksize=5000):
+    """CSVをチャンク読みしながらワークシートへ追記（重複チェック付き）
+
+    CSV全体をDataFrameに展開せず、既存シートのキーを1回だけ取得して
+    チャンク単位で重複を除外しながらappend_rowsする。複数月分の
+    大きなCSVでもピークメモリがチャンクサイズで頭打ちになる。
+    """
+    try:
+        import pandas as pd
+
+        print(f"📋 {sheet_type}の既存データをチェック中...")
+
+        if sheet_type == "釣果データ":
+            key_cols = ['日付', '魚種']
+        else:
+            key_cols = ['日付']
+
+        existing_values = worksheet.get_all_values()
+
+        if existing_values:
+            headers = existing_values[0]
+            key_idx = [headers.index(c) for c in key_cols if c in headers]
+            existing_keys = {
+                '_'.join(row[i] for i in key_idx if i < len(row))
+                for row in existing_values[1:]
+            }
+            print(f"📊 既存{sheet_type}: {len(existing_values) - 1}行")
+            header_needed = False
+        else:
+            print(f"📝 {sheet_type}シートが空 - 全データを追加")
+            existing_keys = set()
+            header_needed = True
+
+        total_added = 0
+        total_skipped = 0
+
+        for chunk in pd.read_csv(csv_path, encoding='utf-8', dtype=str, chunksize=chunksize):
+            chunk = chunk.fillna('')
+
+            if header_needed:
+                worksheet.update('A1', [chunk.columns.tolist()], value_input_option='USER_ENTERED')
+                header_needed = False
+
+            # 重複キー（既存シート + 同一CSV内の先行チャンク）を除外
+            keys = chunk[key_cols[0]].astype(str)
+            for col in key_cols[1:]:
+                keys = keys + '_' + chunk[col].astype(str)
+            mask = ~keys.isin(existing_keys)
+            total_skipped += int((~mask).sum())
+            chunk = chunk[mask]
+
+            if len(chunk) == 0:
+                continue
+
+            worksheet.append_rows(
+                chunk.values.tolist(),
+                value_input_option='USER_ENTERED',
+                insert_data_option='INSERT_ROWS'
+            )
+            existing_keys.update(keys[mask])
+            total_added += len(chunk)
+
+        print(f"✅ {sheet_type}追記完了: 新規追加{total_added}行（重複除外: {total_skipped}行）")
+        return total_added
+
+    except Exception as e:
+        print(f"❌ {sheet_type}追記エラー: {e}")
+        import traceback
+        traceback.print_exc()
+        return 0
+
+def _ensure_anyone_writer(spreadsheet):
+    """「リンクを知っている全員(writer)」共有を未設定の場合のみ適用
+
+    既存の権限一覧を1回確認し、設定済みなら毎回のshare呼び出し
+    （Drive APIへの書き込みリクエスト）をスキップする。
+    """
+    try:
+        for perm in spreadsheet.list_permissions():
+            if perm.get('type') == 'anyone' and perm.get('role') == 'writer':
+                print(f"✅ 共有設定は適用済み（スキップ）")
+                return
+
+        spreadsheet.share(None, perm_type='anyone', role='writer')
+        print(f"✅ スプレッドシートを「リンクを知っている全員」に共有しました")
+    except Exception as share_error:
+        print(f"⚠️ 共有設定エラー: {share_error}")
+
+def upload_to_google_sheets_func(fishing_csv_filename, comment_csv_filename,
+                                 batch_size=5000):
+    """Google Sheets投入（追記機能対応版）
+
+    Args:
+        batch_size (int): 1回のappend_rows呼び出しで送る最大行数。
+            月が大きい場合のHTTPリクエストサイズの上限を制御する
+    """
     try:
         print(f"📤 Google Sheets投入開始（追記版）")
         print(f"  釣果データ: {fishing_csv_filename}")
@@ -504,19 +1112,15 @@ def upload_to_google_sheets_func(fishing_csv_filename, comment_csv_filename):
         try:
             spreadsheet = client.open(spreadsheet_name)
             print(f"✅ 既存スプレッドシート使用: {spreadsheet_name}")
-            
-            # 既存スプレッドシートにも共有設定を適用
-            try:
-                spreadsheet.share(None, perm_type='anyone', role='writer')
-                print(f"✅ 既存スプレッドシートを「リンクを知っている全員」に共有しました")
-            except Exception as share_error:
-                print(f"⚠️ 共有設定エラー: {share_error}")
-                
+
+            # 既存スプレッドシートは共有設定を確認して未設定時のみ適用
+            _ensure_anyone_writer(spreadsheet)
+
         except:
             spreadsheet = client.create(spreadsheet_name)
             print(f"✅ 新規スプレッドシート作成: {spreadsheet_name}")
-            
-            # リンクを知っている全員がアクセス可能に設定
+
+            # 新規作成時は必ず未共有なのでそのまま設定
             try:
                 spreadsheet.share(None, perm_type='anyone', role='writer')
                 print(f"✅ スプレッドシートを「リンクを知っている全員」に共有しました")
@@ -534,33 +1138,33 @@ def upload_to_google_sheets_func(fishing_csv_filename, comment_csv_filename):
         # 釣果データ処理（追記版）
         if fishing_csv_filename and os.path.exists(fishing_csv_filename):
             print("\n🎣 釣果データ処理開始...")
-            new_fishing_df = pd.read_csv(fishing_csv_filename, encoding='utf-8')
-            
+
             try:
                 fishing_worksheet = spreadsheet.worksheet("釣果データ")
                 print("📋 既存の釣果データシートを使用")
             except:
                 fishing_worksheet = spreadsheet.add_worksheet(title="釣果データ", rows=1000, cols=20)
                 print("✅ 新規釣果データシート作成")
-            
-            # 追記処理
-            added_fishing = append_data_to_worksheet(fishing_worksheet, new_fishing_df, "釣果データ")
+
+            # 追記処理（CSVはチャンク読みでメモリに全展開しない）
+            added_fishing = append_csv_to_worksheet(fishing_worksheet, fishing_csv_filename,
+                                                    "釣果データ", chunksize=batch_size)
             results['fishing_count'] = added_fishing
         
         # コメントデータ処理（追記版）
         if comment_csv_filename and os.path.exists(comment_csv_filename):
             print("\n💬 コメントデータ処理開始...")
-            new_comment_df = pd.read_csv(comment_csv_filename, encoding='utf-8')
-            
+
             try:
                 comment_worksheet = spreadsheet.worksheet("コメント")
                 print("📋 既存のコメントシートを使用")
             except:
                 comment_worksheet = spreadsheet.add_worksheet(title="コメント", rows=1000, cols=20)
                 print("✅ 新規コメントシート作成")
-            
-            # 追記処理
-            added_comment = append_data_to_worksheet(comment_worksheet, new_comment_df, "コメントデータ")
+
+            # 追記処理（CSVはチャンク読みでメモリに全展開しない）
+            added_comment = append_csv_to_worksheet(comment_worksheet, comment_csv_filename,
+                                                    "コメントデータ", chunksize=batch_size)
             results['comment_count'] = added_comment
         
         # 結果メッセージ更新
@@ -573,7 +1177,10 @@ def upload_to_google_sheets_func(fishing_csv_filename, comment_csv_filename):
         print(f"   - 合計: {total_added}行追加")
         print(f"🔗 スプレッドシートURL: {results['spreadsheet_url']}")
         print(f"📋 ブラウザで確認してください")
-        
+
+        # この時点でトークンは確実に取得済みなので次回実行のために保存
+        _save_cached_token(_SHEETS_CREDENTIALS)
+
         return results
         
     except Exception as e:
@@ -584,47 +1191,259 @@ def upload_to_google_sheets_func(fishing_csv_filename, comment_csv_filename):
         traceback.print_exc()
         return {'success': False, 'error': error_msg}
 
-def run_scraping(target_year_month, headless=True, upload_to_sheets=True):
-    """スクレイピング実行（Google Sheets投入版）"""
-    scraper = ScrapingCore(headless=headless)
-    
+class DriverPool:
+    """ウォームなChromeセッションの有限プール
+
+    複数月のバックフィルで月毎にChromeを起動し直すと
+    起動（2〜5秒）×月数のコストがかかる。releaseされたセッションは
+    CDPでキャッシュ・クッキーをクリアするだけでプールに戻し、
+    次のacquireで再利用する（サイトには載ったままなので再アクセス不要）。
+    メモリ肥大を抑えるためmax_uses回使ったドライバは破棄して作り直す。
+    """
+
+    def __init__(self, headless=True, max_uses=50, legacy_extract=False,
+                 nav_timeout=15, block_assets=True):
+        self.headless = headless
+        self.max_uses = max_uses
+        self.legacy_extract = legacy_extract
+        self.nav_timeout = nav_timeout
+        self.block_assets = block_assets
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """初期化済み（サイトアクセス済み）のScrapingCoreを取得。失敗時はNone"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        scraper = ScrapingCore(headless=self.headless,
+                               legacy_extract=self.legacy_extract,
+                               nav_timeout=self.nav_timeout,
+                               block_assets=self.block_assets)
+        if not scraper.setup_driver() or not scraper.access_site():
+            scraper.cleanup()
+            return None
+        scraper.pool_uses = 0
+        return scraper
+
+    def release(self, scraper):
+        """使い終わったセッションをリセットしてプールに戻す"""
+        scraper.pool_uses += 1
+        if scraper.pool_uses >= self.max_uses:
+            # 使い込んだChromeはメモリを抱え込むため作り直す
+            scraper.cleanup()
+            return
+
+        try:
+            scraper.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            scraper.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            # リセットできないセッションはプールに戻さず破棄
+            scraper.cleanup()
+            return
+
+        with self._lock:
+            self._idle.append(scraper)
+
+    def close_all(self):
+        """プール内の全セッションを終了する"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for scraper in idle:
+            scraper.cleanup()
+
+
+def _scrape_one_month(target_year_month, headless=True, use_cache=True, cache_ttl_sec=900,
+                      force=False, pool=None, legacy_extract=False, nav_timeout=15,
+                      block_assets=True):
+    """1か月分のスクレイピング（並列ワーカー用・Sheets投入なし）"""
+    # キャッシュが効く月はChromeを起動しない
+    if use_cache and _scrape_cache_read(target_year_month, cache_ttl_sec) is not None:
+        return ScrapingCore(headless=headless).scrape_period(
+            target_year_month, use_cache=use_cache, cache_ttl_sec=cache_ttl_sec, force=force)
+
+    from_pool = pool is not None
+    scraper = pool.acquire() if from_pool else ScrapingCore(
+        headless=headless, legacy_extract=legacy_extract,
+        nav_timeout=nav_timeout, block_assets=block_assets)
+
     try:
-        # WebDriver初期化
-        if not scraper.setup_driver():
-            return {'success': False, 'error': 'WebDriver初期化失敗'}
-        
-        # サイトアクセス
-        if not scraper.access_site():
-            return {'success': False, 'error': 'サイトアクセス失敗'}
-        
+        if from_pool:
+            if scraper is None:
+                return {'success': False, 'error': 'WebDriver初期化失敗'}
+        else:
+            if not scraper.setup_driver():
+                return {'success': False, 'error': 'WebDriver初期化失敗'}
+
+            if not scraper.access_site():
+                return {'success': False, 'error': 'サイトアクセス失敗'}
+
+        return scraper.scrape_period(target_year_month,
+                                     use_cache=use_cache, cache_ttl_sec=cache_ttl_sec,
+                                     force=force)
+
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+    finally:
+        if from_pool:
+            if scraper is not None:
+                pool.release(scraper)
+        else:
+            scraper.cleanup()
+
+
+def run_scraping_multi(target_year_months, headless=True, upload_to_sheets=True, max_workers=None,
+                       use_cache=True, cache_ttl_sec=900, keep_csv=False, force=False,
+                       legacy_extract=False, nav_timeout=15, block_assets=True):
+    """複数月のスクレイピングをワーカー毎のChromeインスタンスで並列実行
+
+    スクレイピングはネットワークとChromedriver IPC待ちが支配的なため、
+    スレッド並列でほぼ線形に短縮できる。Sheets投入は全月の取得完了後に
+    順次行い、シート全体書き換えの競合を避ける。
+    """
+    if max_workers is None:
+        # Vercel環境はメモリ制限が厳しいためChrome 2本まで
+        max_workers = 2 if os.environ.get('VERCEL') == '1' else 4
+    max_workers = max(1, min(max_workers, len(target_year_months)))
+
+    print(f"🧵 {len(target_year_months)}か月分を{max_workers}並列でスクレイピング")
+
+    # ワーカー数を超えるChromeは起動せず、月をまたいでセッションを使い回す
+    pool = DriverPool(headless=headless, legacy_extract=legacy_extract,
+                      nav_timeout=nav_timeout, block_assets=block_assets)
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_scrape_one_month, ym, headless, use_cache,
+                                cache_ttl_sec, force, pool,
+                                legacy_extract, nav_timeout, block_assets): ym
+                for ym in target_year_months
+            }
+            for future in as_completed(futures):
+                ym = futures[future]
+                try:
+                    results[ym] = future.result()
+                except Exception as e:
+                    results[ym] = {'success': False, 'error': str(e)}
+    finally:
+        pool.close_all()
+
+    # Google Sheets投入処理（取得が揃ってから月順に追記）
+    for ym in target_year_months:
+        result = results[ym]
+        if not result.get('success'):
+            continue
+
+        if result.get('unchanged'):
+            result['sheets_result'] = {'success': True, 'message': '前回実行から変化なしのためスキップ'}
+        elif upload_to_sheets and result.get('total_records', 0) > 0:
+            result['sheets_result'] = upload_to_google_sheets_func(
+                result['fishing_csv'],
+                result['comment_csv']
+            )
+            if result['sheets_result'].get('success'):
+                # 投入まで完了した内容だけを「処理済み」として記録する
+                if result.get('content_hash'):
+                    _write_state_hash(ym, result['content_hash'])
+                if not keep_csv:
+                    _remove_uploaded_csv(result)
+        elif upload_to_sheets:
+            result['sheets_result'] = {'success': True, 'message': 'データなしのためスキップ'}
+            if result.get('content_hash'):
+                _write_state_hash(ym, result['content_hash'])
+        else:
+            # --no-sheets時はハッシュを保存しない（後のSheets投入を妨げない）
+            result['sheets_result'] = {'success': True, 'message': 'スキップ'}
+
+    return [results[ym] for ym in target_year_months]
+
+
+def run_scraping(target_year_month, headless=True, upload_to_sheets=True, scraper=None,
+                 sheets_batch_size=5000, use_cache=True, cache_ttl_sec=900,
+                 legacy_extract=False, nav_timeout=15, keep_csv=False, force=False,
+                 block_assets=True):
+    """スクレイピング実行（Google Sheets投入版）
+
+    Args:
+        scraper (ScrapingCore): 初期化済み（setup_driver/access_site済み）の
+            スクレイパーを渡すと、Chrome起動（2〜5秒）とサイト初回アクセスを
+            省略してセッションを再利用する。この場合cleanupは呼び出し側の責任。
+        use_cache (bool): 抽出済み月次データのディスクキャッシュを使うか
+        cache_ttl_sec (int): 当月キャッシュの有効期間（秒）
+        legacy_extract (bool): 一括JS抽出の検証用に要素単位の抽出を強制するか
+        nav_timeout (int): ページ遷移・検索結果待ちのタイムアウト（秒）
+        keep_csv (bool): Sheets投入成功後もCSVファイルを残すか
+        force (bool): 前回実行から内容が同じでも全処理を実行するか
+        block_assets (bool): CDPで画像・フォント・解析タグをブロックするか
+    """
+    own_scraper = scraper is None
+    if own_scraper:
+        scraper = ScrapingCore(headless=headless, legacy_extract=legacy_extract,
+                               nav_timeout=nav_timeout, block_assets=block_assets)
+
+    try:
+        # キャッシュが効く場合はChromeを起動する必要すらない
+        cache_hit = use_cache and _scrape_cache_read(target_year_month, cache_ttl_sec) is not None
+
+        if own_scraper and not cache_hit:
+            # WebDriver初期化
+            if not scraper.setup_driver():
+                return {'success': False, 'error': 'WebDriver初期化失敗'}
+
+            # サイトアクセス
+            if not scraper.access_site():
+                return {'success': False, 'error': 'サイトアクセス失敗'}
+
         # スクレイピング実行
-        result = scraper.scrape_period(target_year_month)
+        result = scraper.scrape_period(target_year_month,
+                                       use_cache=use_cache, cache_ttl_sec=cache_ttl_sec,
+                                       force=force)
         
         if not result['success']:
             return result
         
         # Google Sheets投入処理
-        if upload_to_sheets and result['total_records'] > 0:
+        if result.get('unchanged'):
+            result['sheets_result'] = {'success': True, 'message': '前回実行から変化なしのためスキップ'}
+        elif upload_to_sheets and result['total_records'] > 0:
             print("\n" + "="*60)
             print("📤 Google Sheets投入処理開始")
             print("="*60)
             
             sheets_result = upload_to_google_sheets_func(
-                result['fishing_csv'], 
-                result['comment_csv']
+                result['fishing_csv'],
+                result['comment_csv'],
+                batch_size=sheets_batch_size
             )
             
             result['sheets_result'] = sheets_result
+
+            if sheets_result.get('success'):
+                # 投入まで完了した内容だけを「処理済み」として記録する
+                # （投入失敗時は次回の素のリトライで再投入させる）
+                if result.get('content_hash'):
+                    _write_state_hash(target_year_month, result['content_hash'])
+                # 投入が成功したCSVは中間ファイルのため既定では残さない
+                if not keep_csv:
+                    _remove_uploaded_csv(result)
         elif upload_to_sheets and result['total_records'] == 0:
             print("⚠️ データが0件のためGoogle Sheets投入をスキップしました")
             result['sheets_result'] = {'success': True, 'message': 'データなしのためスキップ'}
+            if result.get('content_hash'):
+                _write_state_hash(target_year_month, result['content_hash'])
         else:
+            # --no-sheets時はハッシュを保存しない
+            # （後でSheets投入ありで実行したとき変化なしスキップさせないため）
             print("⚠️ Google Sheets投入がスキップされました（--no-sheetsオプション）")
             result['sheets_result'] = {'success': True, 'message': 'スキップ'}
-        
+
         return result
-        
+
     except Exception as e:
         return {'success': False, 'error': str(e)}
     finally:
-        scraper.cleanup()
\ No newline at end of file
+        if own_scraper:
+            scraper.cleanup()
\ No newline at end of file
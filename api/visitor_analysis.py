@@ -7,28 +7,62 @@ Phase 5.6: Google Sheetsから天気×曜日別の来場者数平均をリアル
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 from typing import Dict, Any, Optional
 import gspread
-from google.oauth2.service_account import Credentials
-import os
-import json
+import time
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 文字列整形をArrowのCカーネルに乗せるための任意依存
+# （pyarrow未導入の環境では従来のobject文字列のまま動く）
+try:
+    import pyarrow  # noqa: F401
+    _STR_DTYPE = 'string[pyarrow]'
+except ImportError:
+    _STR_DTYPE = str
+
 class VisitorAnalyzer:
     """来場者数動的分析クラス"""
-    
+
+    # 欠損パターン推定用の調整係数
+    # （呼び出しのたびにdictを作り直さないようクラス定数化）
+    WEEKDAY_FACTORS = {
+        'monday': 0.8,
+        'tuesday': 0.85,
+        'wednesday': 0.9,
+        'thursday': 0.95,
+        'friday': 1.0,
+        'saturday': 1.3,
+        'sunday': 1.25
+    }
+    WEATHER_FACTORS = {
+        'sunny': 1.1,
+        'cloudy': 1.0,
+        'rainy': 0.7,
+        'snowy': 0.5
+    }
+
+
     def __init__(self):
         """
         分析器初期化（環境変数認証版）
         """
         self.gc = None
         self.sheet = None
-        
+
+        # 平均値計算結果のTTLキャッシュ
+        # （シートは1日1回しか更新されないため短時間の再計算は無駄）
+        self._cache = None
+        self._cache_ts = 0.0
+        self._cache_ttl = 600  # 10分
+
+        # 必要列のレンジキャッシュ（初回アクセス時にヘッダー行から特定）
+        self._column_ranges = None
+
         # 曜日マッピング
         self.weekday_names = {
             0: 'monday',    # 月曜日
@@ -39,7 +73,10 @@ class VisitorAnalyzer:
             5: 'saturday',  # 土曜日
             6: 'sunday'     # 日曜日
         }
-        
+        # dayofweek(0-6)でそのまま引ける配列版（_clean_dataの一括変換用）
+        self._weekday_arr = np.array(list(self.weekday_names.values()))
+
+
         # 天気マッピング（日本語 → 英語）- 完全版
         self.weather_mapping = {
             '晴れ': 'sunny',
@@ -65,98 +102,133 @@ class VisitorAnalyzer:
             '晴れのち雨': 'rainy',           # 後半が雨
             '曇り時々雨': 'rainy'            # 雨を含む
         }
-        
+
+        # マッピングはSeries化しておき、_clean_dataではreindexで一括変換する
+        # （dict渡しの.mapより速いC実装のハッシュ結合になる）
+        self._weather_series = pd.Series(self.weather_mapping)
+
         self._initialize_sheets()
     
     def _initialize_sheets(self):
-        """Google Sheets初期化（ハイブリッド認証版）"""
+        """Google Sheets初期化（プロセス共有クライアント版）
+
+        認証ロジックはhistorical.pyのget_google_sheets_client
+        （環境変数→ファイルのハイブリッド認証 + プロセス内キャッシュ）
+        と共通化し、FastAPIプロセス内でクライアントとOAuthトークンを
+        使い回す。
+        """
         try:
-            # 認証情報設定
-            scopes = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            
-            # 1. まず環境変数を試す（Render対応）
-            credentials_json = os.environ.get('GOOGLE_CREDENTIALS_JSON')
-            
-            if credentials_json:
-                # 環境変数からの認証（Render環境）
-                try:
-                    credentials_dict = json.loads(credentials_json)
-                    creds = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
-                    self.gc = gspread.authorize(creds)
-                    logger.info("Google Sheets接続成功（環境変数認証）")
-                except Exception as env_error:
-                    logger.warning(f"環境変数認証でエラー: {env_error}")
-                    self.gc = None
-            
-            # 2. 環境変数が失敗した場合、ファイルパス認証（ローカル環境）
-            if not self.gc:
-                credentials_path = "credentials/choka-389510-1103575d64ab.json"
-                if os.path.exists(credentials_path):
-                    creds = Credentials.from_service_account_file(credentials_path, scopes=scopes)
-                    self.gc = gspread.authorize(creds)
-                    logger.info("Google Sheets接続成功（ファイル認証）")
-                else:
-                    logger.error("認証ファイルも環境変数も利用できません")
-                    self.gc = None
-                    self.sheet = None
-                    return
-            
+            try:
+                from api.historical import get_google_sheets_client
+            except ImportError:
+                # スクリプト直接実行時（python api/visitor_analysis.py）用
+                from historical import get_google_sheets_client
+
+            self.gc = get_google_sheets_client()
+            logger.info("Google Sheets接続成功（共有クライアント）")
+
             # スプレッドシート接続（historical.pyと同じ名前を使用）
             spreadsheet = self.gc.open("本牧海釣り施設データ")
             self.sheet = spreadsheet.worksheet("釣果データ")
-            
+
         except Exception as e:
             logger.error(f"Google Sheets初期化エラー: {e}")
             self.gc = None
             self.sheet = None
     
+    def _fetch_required_columns(self) -> Optional[pd.DataFrame]:
+        """必要3列（日付・天気・来場者数）だけをbatch_getで取得
+
+        初回にヘッダー行から列位置を特定してキャッシュし、以降は
+        該当列のレンジだけを1回のbatchGetでまとめて取得する。
+        魚種やコメントなど使わない列を転送しないぶんペイロードが
+        小さくなる。必要列が見つからない・取得に失敗した場合は
+        Noneを返し、呼び出し側が全列取得にフォールバックする。
+        """
+        required = ('日付', '天気', '来場者数')
+        try:
+            if self._column_ranges is None:
+                header_row = self.sheet.row_values(1)
+                ranges = []
+                for name in required:
+                    if name not in header_row:
+                        logger.warning(f"ヘッダーに必要列がありません: {name}")
+                        return None
+                    col_number = header_row.index(name) + 1
+                    # "C1" -> "C" のように列レターだけを取り出す
+                    letter = gspread.utils.rowcol_to_a1(1, col_number)[:-1]
+                    ranges.append(f"{letter}:{letter}")
+                self._column_ranges = ranges
+
+            columns = self.sheet.batch_get(self._column_ranges)
+
+            data = {}
+            for col_values in columns:
+                flat = [row[0] if row else '' for row in col_values]
+                if not flat:
+                    return None
+                data[flat[0]] = flat[1:]
+
+            # 列ごとに末尾の空セルが落ちて行数が揃わないことがあるため補完
+            n_rows = max(len(v) for v in data.values())
+            for key, values in data.items():
+                if len(values) < n_rows:
+                    data[key] = values + [''] * (n_rows - len(values))
+
+            return pd.DataFrame(data)
+
+        except Exception as e:
+            logger.warning(f"列指定取得でエラー: {e}")
+            self._column_ranges = None
+            return None
+
     def fetch_latest_data(self) -> pd.DataFrame:
         """
         Google Sheetsから最新データ取得
-        
+
         Returns:
             最新データのDataFrame
         """
         try:
             if not self.sheet:
                 raise Exception("Google Sheets未接続")
-            
+
             logger.info("Google Sheetsから最新データ取得開始")
-            
-            # 全データ取得（ヘッダー重複対応）
-            try:
-                records = self.sheet.get_all_records()
-            except Exception as header_error:
-                logger.warning(f"標準的な取得でエラー: {header_error}")
-                # ヘッダー重複エラーの場合、手動でヘッダーを指定
-                logger.info("手動ヘッダー指定で再試行")
-                all_values = self.sheet.get_all_values()
-                if len(all_values) > 0:
-                    # 最初の行をヘッダーとして使用し、空の列は無視
-                    headers = [h if h.strip() else f"col_{i}" for i, h in enumerate(all_values[0])]
-                    # 重複を避けるため、連番を追加
-                    seen = {}
-                    for i, header in enumerate(headers):
-                        if header in seen:
-                            seen[header] += 1
-                            headers[i] = f"{header}_{seen[header]}"
-                        else:
-                            seen[header] = 0
-                    
-                    records = []
-                    for row in all_values[1:]:
-                        record = {}
-                        for i, value in enumerate(row):
-                            if i < len(headers):
-                                record[headers[i]] = value
-                        records.append(record)
-                else:
-                    records = []
-            
-            df = pd.DataFrame(records)
+
+            # まず必要列だけの取得を試す（転送量が約1/5になる）
+            df = self._fetch_required_columns()
+
+            if df is not None:
+                logger.info(f"取得データ件数: {len(df)}（列指定取得）")
+                df = self._clean_data(df)
+                logger.info(f"クリーニング後件数: {len(df)}")
+                return df
+
+            # フォールバック: 全データ取得
+            # get_all_records()は行ごとにdictを作る遅いパスなので使わず、
+            # 常にget_all_values()から直接DataFrameを構築する
+            all_values = self.sheet.get_all_values()
+
+            if len(all_values) > 0:
+                # 最初の行をヘッダーとして使用し、空の列は無視
+                headers = [h if h.strip() else f"col_{i}" for i, h in enumerate(all_values[0])]
+                # 重複を避けるため、連番を追加
+                seen = {}
+                for i, header in enumerate(headers):
+                    if header in seen:
+                        seen[header] += 1
+                        headers[i] = f"{header}_{seen[header]}"
+                    else:
+                        seen[header] = 0
+
+                # ヘッダーより長い行が混ざっても落ちないよう列数で切り揃える
+                # （行dictを作らずリストのまま一括でDataFrame化する）
+                df = pd.DataFrame(
+                    [row[:len(headers)] for row in all_values[1:]],
+                    columns=headers
+                )
+            else:
+                df = pd.DataFrame()
             
             logger.info(f"取得データ件数: {len(df)}")
             
@@ -205,39 +277,50 @@ class VisitorAnalyzer:
             # 日付列の処理
             if '日付' in df.columns:
                 # 日付から曜日部分を除去（例: "2025/01/31(金)" → "2025/01/31"）
-                df['日付'] = df['日付'].astype(str).str.replace(r'\([月火水木金土日]\)', '', regex=True)
-                df['日付'] = pd.to_datetime(df['日付'], errors='coerce')
+                # 日付部分はYYYY/MM/DDの固定10文字なので正規表現ではなくスライスで切る
+                # （pyarrow導入環境ではスライスがArrowのCカーネルで実行される）
+                df['日付'] = df['日付'].astype(_STR_DTYPE).str[:10]
+                df['日付'] = pd.to_datetime(df['日付'], format='%Y/%m/%d', errors='coerce')
                 df = df.dropna(subset=['日付'])
                 
-                # 曜日追加
-                df['曜日番号'] = df['日付'].dt.dayofweek
-                df['曜日英語'] = df['曜日番号'].map(self.weekday_names)
+                # 曜日追加（カテゴリ型: 7種類の固定値なのでobject型より軽い）
+                # dayofweekを添字にした配列参照1回で変換し、下流で使わない
+                # 曜日番号列は作らない
+                df['曜日英語'] = pd.Categorical(
+                    self._weekday_arr[df['日付'].dt.dayofweek.to_numpy()],
+                    categories=list(self.weekday_names.values())
+                )
             
             # 天気列の処理
             if '天気' in df.columns:
                 # マッピング前の天気パターンをログ出力
                 unique_weather = df['天気'].unique()
                 logger.info(f"データ内の天気パターン: {unique_weather}")
-                
-                # 天気マッピング実行
-                df['天気英語'] = df['天気'].map(self.weather_mapping)
-                
+
+                # 天気マッピング実行（Series.reindexによる一括変換）
+                df['天気英語'] = self._weather_series.reindex(df['天気'].values).values
+
                 # マッピングされなかった天気をログ出力
-                unmapped = df[df['天気英語'].isna()]['天気'].unique()
+                unmapped = np.setdiff1d(unique_weather.astype(str), self._weather_series.index)
                 if len(unmapped) > 0:
                     logger.warning(f"マッピングされていない天気パターン: {unmapped}")
                 
                 # マッピングされなかった値は警告してからcloudyにする
-                df['天気英語'] = df['天気英語'].fillna('cloudy')
+                df['天気英語'] = pd.Categorical(
+                    df['天気英語'].fillna('cloudy'),
+                    categories=['sunny', 'cloudy', 'rainy', 'snowy']
+                )
             
             # 来場者数の処理
             if '来場者数' in df.columns:
-                # 来場者数から「名」「人」などの単位を除去
-                df['来場者数'] = df['来場者数'].astype(str).str.replace(r'[名人]', '', regex=True)
+                # 来場者数から「名」「人」などの単位を除去（末尾固定なのでrstripで十分）
+                df['来場者数'] = df['来場者数'].astype(_STR_DTYPE).str.rstrip('名人 ')
                 df['来場者数'] = pd.to_numeric(df['来場者数'], errors='coerce')
                 df = df.dropna(subset=['来場者数'])
                 # 異常値除外（0-2000人の範囲）
                 df = df[(df['来場者数'] >= 0) & (df['来場者数'] <= 2000)]
+                # 範囲確定後はint32で十分（float64の半分のメモリ）
+                df['来場者数'] = df['来場者数'].astype('int32')
             
             # 無効なデータを除外
             df = df.dropna(subset=['日付', '天気英語', '曜日英語', '来場者数'])
@@ -249,13 +332,26 @@ class VisitorAnalyzer:
             logger.error(f"データクリーニングエラー: {e}")
             return df
     
+    def invalidate_cache(self):
+        """平均値キャッシュを破棄（次回呼び出し時に再計算）"""
+        self._cache = None
+        self._cache_ts = 0.0
+
     def calculate_visitor_averages(self) -> Dict[str, Any]:
         """
         天気×曜日別の来場者数平均を計算
-        
+
+        結果はTTL付きでキャッシュされ、有効期間内の再呼び出しは
+        Sheetsへのアクセスと再計算をスキップする。
+
         Returns:
             平均値辞書と統計情報
         """
+        # キャッシュが有効ならそのまま返す（エラー結果はキャッシュしない）
+        if self._cache is not None and (time.time() - self._cache_ts) < self._cache_ttl:
+            logger.info("来場者数平均: キャッシュから返却")
+            return self._cache
+
         try:
             # 最新データ取得
             df = self.fetch_latest_data()
@@ -282,37 +378,48 @@ class VisitorAnalyzer:
             # 天気別・曜日別の組み合わせごとに平均計算
             weather_types = ['sunny', 'cloudy', 'rainy', 'snowy']
             weekday_types = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            
+
+            # 1回のgroupbyで全組み合わせの統計をまとめて計算
+            # （従来は28パターンそれぞれで全件のブールマスク走査を行っていた）
+            grouped = df.groupby(['天気英語', '曜日英語'], observed=True)['来場者数'].agg(
+                ['mean', 'std', 'count', 'min', 'max']
+            )
+
+            # 欠損パターン推定用の天気別基準平均をループの外で1回だけ計算
+            # （従来はパターンごとにaverages全体を走査し直していた）
+            weather_means = grouped['mean'].groupby(level=0, observed=True).mean()
+            base_by_weather = {
+                w: round(float(weather_means[w]), 1)
+                if w in weather_means.index and not pd.isna(weather_means[w])
+                else 300.0
+                for w in weather_types
+            }
+
             for weather in weather_types:
                 for weekday in weekday_types:
-                    # 該当データ抽出
-                    filtered_data = df[
-                        (df['天気英語'] == weather) & 
-                        (df['曜日英語'] == weekday)
-                    ]
-                    
                     key = f"{weather}_{weekday}"
-                    
-                    if len(filtered_data) > 0:
-                        avg_visitors = filtered_data['来場者数'].mean()
-                        std_visitors = filtered_data['来場者数'].std()
-                        count = len(filtered_data)
-                        
+
+                    if (weather, weekday) in grouped.index:
+                        stats = grouped.loc[(weather, weekday)]
+                        avg_visitors = float(stats['mean'])
+                        std_visitors = stats['std']
+                        count = int(stats['count'])
+
                         averages[key] = {
                             'average': round(avg_visitors, 1),
-                            'std': round(std_visitors, 1) if not pd.isna(std_visitors) else 0,
+                            'std': round(float(std_visitors), 1) if not pd.isna(std_visitors) else 0,
                             'count': count,
-                            'min': int(filtered_data['来場者数'].min()),
-                            'max': int(filtered_data['来場者数'].max())
+                            'min': int(stats['min']),
+                            'max': int(stats['max'])
                         }
-                        
+
                         statistics['pattern_counts'][key] = count
-                        
+
                         logger.info(f"{weather}×{weekday}: {avg_visitors:.1f}人 (n={count})")
-                        
+
                     else:
                         # データがない場合は推定値
-                        estimated_avg = self._estimate_missing_pattern(weather, weekday, averages)
+                        estimated_avg = self._estimate_missing_pattern(weather, weekday, base_by_weather[weather])
                         averages[key] = {
                             'average': estimated_avg,
                             'std': 0,
@@ -331,64 +438,44 @@ class VisitorAnalyzer:
             statistics['calculation_time'] = datetime.now().isoformat()
             
             logger.info(f"天気×曜日別平均計算完了: {len(averages)}パターン")
-            
-            return {
+
+            result = {
                 'averages': averages,
                 'statistics': statistics,
                 'status': 'success'
             }
-            
+
+            # 成功時のみキャッシュに保存
+            self._cache = result
+            self._cache_ts = time.time()
+
+            return result
+
+
         except Exception as e:
             logger.error(f"平均計算エラー: {e}")
             return self._get_fallback_averages()
     
-    def _estimate_missing_pattern(self, weather: str, weekday: str, existing_averages: Dict) -> float:
+    def _estimate_missing_pattern(self, weather: str, weekday: str, base_avg: float) -> float:
         """
         データが不足しているパターンの推定値計算
-        
+
         Args:
             weather: 天気
             weekday: 曜日
-            existing_averages: 既存の平均値
-            
+            base_avg: 同じ天気の観測済みパターンから算出した基準平均
+
         Returns:
             推定来場者数
         """
         try:
-            # 同じ天気の他の曜日の平均を使用
-            same_weather_avgs = []
-            for key, data in existing_averages.items():
-                if key.startswith(f"{weather}_") and data['count'] > 0:
-                    same_weather_avgs.append(data['average'])
-            
-            if same_weather_avgs:
-                base_avg = np.mean(same_weather_avgs)
-            else:
-                # 全体的な基準値
-                base_avg = 300
-            
-            # 曜日による調整
-            weekday_factors = {
-                'monday': 0.8,
-                'tuesday': 0.85,
-                'wednesday': 0.9,
-                'thursday': 0.95,
-                'friday': 1.0,
-                'saturday': 1.3,
-                'sunday': 1.25
-            }
-            
-            # 天気による調整
-            weather_factors = {
-                'sunny': 1.1,
-                'cloudy': 1.0,
-                'rainy': 0.7,
-                'snowy': 0.5
-            }
-            
-            estimated = base_avg * weekday_factors.get(weekday, 1.0) * weather_factors.get(weather, 1.0)
+            estimated = (
+                base_avg
+                * self.WEEKDAY_FACTORS.get(weekday, 1.0)
+                * self.WEATHER_FACTORS.get(weather, 1.0)
+            )
             return round(estimated, 1)
-            
+
         except Exception as e:
             logger.error(f"推定値計算エラー: {e}")
             return 300.0
@@ -6,30 +6,113 @@ Google Sheetsからの釣果データ読み込みモジュール
 """
 
 import os
+import time
+import tempfile
 import pandas as pd
+import numpy as np
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 import re
 
+# 数値抽出用の事前コンパイル済みパターン（str.extractへ直接渡す）
+_TEMP_RE = re.compile(r'(\d+\.?\d*)')     # "26.0℃" -> 26.0
+_VISITOR_RE = re.compile(r'(\d+)')        # "400名" -> 400
+
+# ディスクキャッシュの形式。parquetエンジンがない環境では
+# pickleにフォールバックしてキャッシュ自体は機能させる
+try:
+    import pyarrow  # noqa: F401
+    _CACHE_EXT = 'parquet'
+except ImportError:
+    _CACHE_EXT = 'pkl'
+
+def _rows_to_df(rows):
+    """ヘッダー行付きの2次元リストからDataFrameを構築
+
+    行ごとのdict化（get_all_records相当）を経由せず、値リストを
+    そのままpandasに渡す。ヘッダーより長い行が混ざっても落ちない
+    よう列数で切り揃える。
+    """
+    headers = rows[0]
+    return pd.DataFrame([r[:len(headers)] for r in rows[1:]], columns=headers)
+
+def _parse_date_series(date_series):
+    """日付列をまとめてdatetime型に変換（"2025/07/28(月)" → Timestamp）
+
+    行ごとのapply + to_datetimeではなく、str演算とto_datetimeを
+    列全体に1回ずつ適用する。変換できない値はNaTになる。
+    """
+    date_part = date_series.astype('string').str.split('(', n=1).str[0].str.strip()
+    return pd.to_datetime(date_part, format='%Y/%m/%d', errors='coerce')
+
 class FishingDataLoader:
     """釣果データ読み込みクラス"""
     
-    def __init__(self, credentials_path=None):
+    def __init__(self, credentials_path=None, cache_dir=None, cache_ttl_sec=600):
         """
         初期化
-        
+
         Args:
             credentials_path (str): Google Sheets認証ファイルパス
+            cache_dir (str): 前処理済みデータのディスクキャッシュ保存先
+            cache_ttl_sec (int): キャッシュの有効期間（秒）
         """
         if credentials_path is None:
             # デフォルトの認証ファイルパス
             credentials_path = r"C:\Users\kataoka.akihito\Documents\MyPython\env313\choka-389510-1103575d64ab.json"
-        
+
+        if cache_dir is None:
+            cache_dir = os.path.join(tempfile.gettempdir(), "fishing_ml_cache")
+
         self.credentials_path = credentials_path
         self.client = None
         self.spreadsheet = None
         self.spreadsheet_name = "本牧海釣り施設データ"
+        self.cache_dir = cache_dir
+        self.cache_ttl_sec = cache_ttl_sec
+        # batchGetで取得した生データ（釣果rows, コメントrows）の保持用
+        self._raw_sheets = None
+        # 前処理済みDataFrameのインスタンスキャッシュ
+        # （get_data_summaryと下流パイプラインの二重ロードを防ぐ）
+        self._fishing_df = None
+        self._comment_df = None
+
+    def refresh(self):
+        """インスタンス上のキャッシュを破棄して次回ロード時に再取得させる"""
+        self._raw_sheets = None
+        self._fishing_df = None
+        self._comment_df = None
+
+    def _cache_path(self, name):
+        """キャッシュファイルのパスを取得"""
+        return os.path.join(self.cache_dir, f"{name}.{_CACHE_EXT}")
+
+    def _read_cache(self, name):
+        """TTL内のディスクキャッシュがあれば読み込む（なければNone）"""
+        try:
+            path = self._cache_path(name)
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < self.cache_ttl_sec:
+                if _CACHE_EXT == 'parquet':
+                    df = pd.read_parquet(path)
+                else:
+                    df = pd.read_pickle(path)
+                print(f"✅ {name}をディスクキャッシュから読み込み: {len(df)}行")
+                return df
+        except Exception as e:
+            print(f"⚠️ キャッシュ読み込み失敗（通常取得にフォールバック）: {e}")
+        return None
+
+    def _write_cache(self, name, df):
+        """前処理済みDataFrameをディスクキャッシュに保存"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if _CACHE_EXT == 'parquet':
+                df.to_parquet(self._cache_path(name))
+            else:
+                df.to_pickle(self._cache_path(name))
+        except Exception as e:
+            print(f"⚠️ キャッシュ書き込み失敗: {e}")
     
     def setup_client(self):
         """Google Sheetsクライアント初期化"""
@@ -58,75 +141,131 @@ class FishingDataLoader:
             print(f"❌ Google Sheets初期化エラー: {e}")
             return False
     
-    def load_fishing_data(self):
+    def _load_both_sheets(self):
+        """釣果データとコメントの2シートを1回のbatchGetで取得
+
+        HTTP往復が2回から1回になる。取得結果の生データは
+        インスタンスに保持し、同一ローダーの2回目以降の呼び出し
+        （get_data_summaryなど）ではネットワークに出ない。
+
+        Returns:
+            tuple: (釣果データrows, コメントrows) / 失敗時はNone
+        """
+        if self._raw_sheets is not None:
+            return self._raw_sheets
+
+        if not self.client:
+            if not self.setup_client():
+                return None
+
+        try:
+            response = self.spreadsheet.values_batch_get(['釣果データ', 'コメント'])
+            value_ranges = response.get('valueRanges', [])
+            fishing_rows = value_ranges[0].get('values', []) if len(value_ranges) > 0 else []
+            comment_rows = value_ranges[1].get('values', []) if len(value_ranges) > 1 else []
+        except Exception as e:
+            print(f"⚠️ batchGet失敗、シート個別取得にフォールバック: {e}")
+            fishing_rows = self.spreadsheet.worksheet("釣果データ").get_all_values()
+            comment_rows = self.spreadsheet.worksheet("コメント").get_all_values()
+
+        self._raw_sheets = (fishing_rows, comment_rows)
+        return self._raw_sheets
+
+    def load_fishing_data(self, force_refresh=False):
         """
         釣果データを読み込み
-        
+
+        Args:
+            force_refresh (bool): Trueでディスクキャッシュを無視して再取得
+
         Returns:
             pd.DataFrame: 釣果データ（前処理済み）
         """
         try:
-            if not self.client:
-                if not self.setup_client():
-                    return None
-            
             print("📊 釣果データ読み込み中...")
-            
-            # 釣果データシートから読み込み
-            fishing_sheet = self.spreadsheet.worksheet("釣果データ")
-            fishing_records = fishing_sheet.get_all_records()
-            
-            if not fishing_records:
+
+            if force_refresh:
+                self.refresh()
+            elif self._fishing_df is not None:
+                return self._fishing_df
+            else:
+                cached = self._read_cache("fishing")
+                if cached is not None:
+                    self._fishing_df = cached
+                    return cached
+
+            raw = self._load_both_sheets()
+            if raw is None:
+                return None
+            fishing_rows = raw[0]
+
+            if len(fishing_rows) < 2:
                 print("⚠️ 釣果データが見つかりません")
                 return None
-            
-            # DataFrameに変換
-            df = pd.DataFrame(fishing_records)
-            
+
+            # DataFrameに変換（1行目をヘッダーとして使用）
+            df = _rows_to_df(fishing_rows)
+
             print(f"✅ 釣果データ読み込み完了: {len(df)}行")
             print(f"📅 期間: {df['日付'].min()} ～ {df['日付'].max()}")
-            
+
             # 基本的な前処理
             df = self._preprocess_fishing_data(df)
-            
+
+            self._fishing_df = df
+            self._write_cache("fishing", df)
+
             return df
-            
+
         except Exception as e:
             print(f"❌ 釣果データ読み込みエラー: {e}")
             return None
-    
-    def load_comment_data(self):
+
+    def load_comment_data(self, force_refresh=False):
         """
         コメントデータを読み込み
-        
+
+        Args:
+            force_refresh (bool): Trueでディスクキャッシュを無視して再取得
+
         Returns:
             pd.DataFrame: コメントデータ（前処理済み）
         """
         try:
-            if not self.client:
-                if not self.setup_client():
-                    return None
-            
             print("💬 コメントデータ読み込み中...")
-            
-            # コメントシートから読み込み
-            comment_sheet = self.spreadsheet.worksheet("コメント")
-            comment_records = comment_sheet.get_all_records()
-            
-            if not comment_records:
+
+            if force_refresh:
+                self.refresh()
+            elif self._comment_df is not None:
+                return self._comment_df
+            else:
+                cached = self._read_cache("comment")
+                if cached is not None:
+                    self._comment_df = cached
+                    return cached
+
+            raw = self._load_both_sheets()
+            if raw is None:
+                return None
+            comment_rows = raw[1]
+
+            if len(comment_rows) < 2:
                 print("⚠️ コメントデータが見つかりません")
                 return None
-            
-            # DataFrameに変換
-            df = pd.DataFrame(comment_records)
-            
+
+            # DataFrameに変換（1行目をヘッダーとして使用）
+            df = _rows_to_df(comment_rows)
+
             print(f"✅ コメントデータ読み込み完了: {len(df)}行")
-            
+
             # 基本的な前処理
             df = self._preprocess_comment_data(df)
-            
+
+            self._comment_df = df
+            self._write_cache("comment", df)
+
             return df
-            
+
         except Exception as e:
             print(f"❌ コメントデータ読み込みエラー: {e}")
             return None
@@ -136,25 +275,34 @@ class FishingDataLoader:
         try:
             print("🔧 釣果データ前処理中...")
             
-            # 日付処理
-            df['日付_parsed'] = df['日付'].apply(self._parse_date)
-            df['年'] = df['日付_parsed'].dt.year
-            df['月'] = df['日付_parsed'].dt.month
-            df['日'] = df['日付_parsed'].dt.day
-            df['曜日'] = df['日付_parsed'].dt.dayofweek  # 0=月曜日
-            
+            # 日付処理（列全体を一括変換）
+            df['日付_parsed'] = _parse_date_series(df['日付'])
+
+            # 無効日付は時間特徴量の抽出前に落とす
+            df = df.dropna(subset=['日付_parsed'])
+
+            # 年月日・曜日は1つのDatetimeIndexからまとめてブロック代入
+            # （列ごとの個別代入4回分のインデックス整列を省く。int16で十分）
+            idx = pd.DatetimeIndex(df['日付_parsed'])
+            df[['年', '月', '日', '曜日']] = np.column_stack([
+                idx.year, idx.month, idx.day, idx.dayofweek  # 曜日: 0=月曜日
+            ]).astype('int16')
+
             # 数値データの処理
             df['釣果数'] = pd.to_numeric(df['釣果数'], errors='coerce').fillna(0)
             
-            # 水温の数値化（"26.0℃" -> 26.0）
-            df['水温_数値'] = df['水温'].apply(self._extract_temperature)
-            
+            # 水温の数値化（"26.0℃" -> 26.0）: str.extractで列一括抽出
+            df['水温_数値'] = pd.to_numeric(
+                df['水温'].astype('string').str.extract(_TEMP_RE, expand=False),
+                errors='coerce'
+            )
+
             # 来場者数の数値化（"400名" -> 400）
-            df['来場者数_数値'] = df['来場者数'].apply(self._extract_visitor_count)
-            
-            # 欠損値の処理
-            df = df.dropna(subset=['日付_parsed'])
-            
+            df['来場者数_数値'] = pd.to_numeric(
+                df['来場者数'].astype('string').str.extract(_VISITOR_RE, expand=False),
+                errors='coerce'
+            ).astype('Int64')
+
             print(f"✅ 釣果データ前処理完了: {len(df)}行")
             
             return df
@@ -168,20 +316,28 @@ class FishingDataLoader:
         try:
             print("🔧 コメントデータ前処理中...")
             
-            # 日付処理
-            df['日付_parsed'] = df['日付'].apply(self._parse_date)
-            df['年'] = df['日付_parsed'].dt.year
-            df['月'] = df['日付_parsed'].dt.month
-            df['日'] = df['日付_parsed'].dt.day
-            df['曜日'] = df['日付_parsed'].dt.dayofweek
-            
-            # 水温・来場者数の数値化
-            df['水温_数値'] = df['水温'].apply(self._extract_temperature)
-            df['来場者数_数値'] = df['来場者数'].apply(self._extract_visitor_count)
-            
-            # 欠損値の処理
+            # 日付処理（列全体を一括変換）
+            df['日付_parsed'] = _parse_date_series(df['日付'])
+
+            # 無効日付は時間特徴量の抽出前に落とす
             df = df.dropna(subset=['日付_parsed'])
-            
+
+            # 年月日・曜日は1つのDatetimeIndexからまとめてブロック代入
+            idx = pd.DatetimeIndex(df['日付_parsed'])
+            df[['年', '月', '日', '曜日']] = np.column_stack([
+                idx.year, idx.month, idx.day, idx.dayofweek
+            ]).astype('int16')
+            
+            # 水温・来場者数の数値化（str.extractで列一括抽出）
+            df['水温_数値'] = pd.to_numeric(
+                df['水温'].astype('string').str.extract(_TEMP_RE, expand=False),
+                errors='coerce'
+            )
+            df['来場者数_数値'] = pd.to_numeric(
+                df['来場者数'].astype('string').str.extract(_VISITOR_RE, expand=False),
+                errors='coerce'
+            ).astype('Int64')
+
             print(f"✅ コメントデータ前処理完了: {len(df)}行")
             
             return df
@@ -190,37 +346,6 @@ class FishingDataLoader:
             print(f"❌ コメントデータ前処理エラー: {e}")
             return df
     
-    def _parse_date(self, date_str):
-        """日付文字列をdatetimeに変換"""
-        try:
-            # "2025/07/28(月)" -> "2025/07/28"
-            date_part = str(date_str).split('(')[0].strip()
-            return pd.to_datetime(date_part, format='%Y/%m/%d')
-        except:
-            return pd.NaT
-    
-    def _extract_temperature(self, temp_str):
-        """水温文字列から数値を抽出"""
-        try:
-            # "26.0℃" -> 26.0
-            match = re.search(r'(\d+\.?\d*)', str(temp_str))
-            if match:
-                return float(match.group(1))
-            return None
-        except:
-            return None
-    
-    def _extract_visitor_count(self, visitor_str):
-        """来場者数文字列から数値を抽出"""
-        try:
-            # "400名" -> 400
-            match = re.search(r'(\d+)', str(visitor_str))
-            if match:
-                return int(match.group(1))
-            return None
-        except:
-            return None
-    
     def get_data_summary(self):
         """データサマリー情報を取得"""
         try:
@@ -11,9 +11,32 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from sklearn.impute import SimpleImputer
 import warnings
 warnings.filterwarnings('ignore')
 
+# pandas 2.xのCopy-on-Writeを有効化
+# （スライスやastypeの防御的コピーが実際に書き込むまで遅延され、
+#   特徴量パイプラインの中間フレームのメモリ確保が必要時のみになる）
+pd.options.mode.copy_on_write = True
+
+# 月(1-12)から季節を引くための配列（添字は月-1）
+SEASON_BY_MONTH = np.array(['冬', '冬', '春', '春', '春', '夏', '夏', '夏', '秋', '秋', '秋', '冬'])
+
+# カテゴリエンコード用の固定カテゴリ（並び順がそのままコード値になる）
+WEATHER_CATS = ['晴れ', '曇り', '雨', '雪']
+TIDE_CATS = ['大潮', '中潮', '小潮', '長潮', '若潮']
+SEASON_CATS = ['春', '夏', '秋', '冬']
+
+def _clean_dates(date_series):
+    """日付列から曜日部分を除去してdatetime型に一括変換
+
+    '2025/01/31(金)' → Timestamp('2025-01-31')。行ごとのapplyではなく
+    str演算とto_datetimeを列全体に1回ずつ適用する。
+    """
+    date_part = date_series.astype('string').str.split('(', n=1).str[0]
+    return pd.to_datetime(date_part, errors='coerce')
+
 class AjiFishingFeatureEngineer:
     """アジ釣果予測用特徴量エンジニアリング"""
     
@@ -22,6 +45,8 @@ class AjiFishingFeatureEngineer:
         self.target_species = 'アジ'
         self.categorical_encoders = {}
         self.feature_columns = []
+        # 欠損値補完器（初回のcreate_featuresでfitし、以降は同じ平均を再利用）
+        self.imputer = None
         
     def analyze_aji_data(self, fishing_df):
         """アジデータの分析・統計情報出力"""
@@ -29,25 +54,22 @@ class AjiFishingFeatureEngineer:
         print("=" * 50)
         
         # アジデータの抽出
-        aji_data = fishing_df[fishing_df['魚種'] == self.target_species].copy()
-        
+        aji_data = fishing_df.loc[fishing_df['魚種'].eq(self.target_species), :].copy()
+
         if len(aji_data) == 0:
             print(f"❌ {self.target_species}のデータが見つかりません")
             return None
-        
+
         # 日付データの確認
         print(f"🔍 日付データサンプル:")
         print(aji_data['日付'].head(5).tolist())
-        
-        # 日付から曜日部分を除去してdatetime型に変換
-        def clean_date(date_str):
-            if isinstance(date_str, str):
-                # '2025/01/31(金)' → '2025/01/31'
-                return date_str.split('(')[0]
-            return date_str
-        
-        aji_data['日付_クリーン'] = aji_data['日付'].apply(clean_date)
-        aji_data['日付'] = pd.to_datetime(aji_data['日付_クリーン'], errors='coerce')
+
+        # data_loaderの前処理でパース済みの列があれば再パースせず使い回す
+        if '日付_parsed' in aji_data.columns:
+            aji_data['日付'] = aji_data['日付_parsed']
+        else:
+            # 日付から曜日部分を除去してdatetime型に変換（一括変換）
+            aji_data['日付'] = _clean_dates(aji_data['日付'])
         
         # NaTの確認
         nat_count = aji_data['日付'].isna().sum()
@@ -70,8 +92,8 @@ class AjiFishingFeatureEngineer:
         # 釣り場別統計
         print(f"\n🏖️ 釣り場別{self.target_species}釣果:")
         place_stats = aji_data.groupby('釣り場')['釣果数'].agg(['count', 'sum', 'mean']).round(1)
-        for place, stats in place_stats.iterrows():
-            print(f"  {place}: {stats['count']}日, 総数{stats['sum']}匹, 平均{stats['mean']}匹")
+        # iterrowsの行ごとSeries構築を避けて一括整形
+        print(place_stats.rename(columns={'count': '日数', 'sum': '総数', 'mean': '平均'}).to_string())
         
         # 月別統計（有効な日付のみ）
         if len(valid_dates) > 0:
@@ -79,43 +101,28 @@ class AjiFishingFeatureEngineer:
             aji_data_valid = aji_data[aji_data['日付'].notna()].copy()
             aji_data_valid['月'] = aji_data_valid['日付'].dt.month
             month_stats = aji_data_valid.groupby('月')['釣果数'].agg(['count', 'sum', 'mean']).round(1)
-            for month, stats in month_stats.iterrows():
-                print(f"  {month}月: {stats['count']}日, 総数{stats['sum']}匹, 平均{stats['mean']}匹")
+            print(month_stats.rename(columns={'count': '日数', 'sum': '総数', 'mean': '平均'}).to_string())
             
         return aji_data
     
     def create_time_features(self, df):
-        """時間関連特徴量の作成"""
-        df = df.copy()
-        
-        # 日付から曜日部分を除去してdatetime型に変換
-        def clean_date(date_str):
-            if isinstance(date_str, str):
-                # '2025/01/31(金)' → '2025/01/31'
-                return date_str.split('(')[0]
-            return date_str
-        
-        df['日付_クリーン'] = df['日付'].apply(clean_date)
-        df['日付'] = pd.to_datetime(df['日付_クリーン'], errors='coerce')
-        
-        # 基本時間特徴量
-        df['年'] = df['日付'].dt.year
-        df['月'] = df['日付'].dt.month
-        df['日'] = df['日付'].dt.day
-        df['曜日'] = df['日付'].dt.dayofweek  # 月曜=0, 日曜=6
-        
-        # 季節特徴量
-        def get_season(month):
-            if month in [3, 4, 5]:
-                return '春'
-            elif month in [6, 7, 8]:
-                return '夏'
-            elif month in [9, 10, 11]:
-                return '秋'
-            else:
-                return '冬'
-        
-        df['季節'] = df['月'].apply(get_season)
+        """時間関連特徴量の作成（引数のDataFrameに直接列を追加する）"""
+
+        # すでにdatetime型（上流でパース済み）なら再パースしない
+        if not pd.api.types.is_datetime64_any_dtype(df['日付']):
+            df['日付'] = _clean_dates(df['日付'])
+        
+        # 基本時間特徴量（1回のブロック代入にまとめて列挿入4回分の
+        # インデックス整列を省く。NaTはNaNとして残るのでint化はしない）
+        dt = df['日付'].dt
+        df[['年', '月', '日', '曜日']] = np.column_stack([
+            dt.year, dt.month, dt.day, dt.dayofweek  # 曜日: 月曜=0, 日曜=6
+        ])
+        
+        # 季節特徴量（月を添字にした配列参照1回で変換）
+        # 日付がNaTで月が欠損した行は従来のget_seasonと同じく'冬'扱い
+        month_idx = df['月'].fillna(1).astype(int).to_numpy() - 1
+        df['季節'] = SEASON_BY_MONTH[month_idx]
         
         # 休日フラグ（土日を休日とする）
         df['休日フラグ'] = (df['曜日'] >= 5).astype(int)  # 土曜=5, 日曜=6
@@ -123,51 +130,38 @@ class AjiFishingFeatureEngineer:
         return df
     
     def encode_categorical_features(self, df):
-        """カテゴリ特徴量のエンコーディング"""
-        df = df.copy()
-        
-        # 天気のエンコーディング
-        weather_mapping = {
-            '晴れ': 0, '晴': 0,
-            '曇り': 1, '曇': 1,
-            '雨': 2,
-            '雪': 3
-        }
+        """カテゴリ特徴量のエンコーディング（引数のDataFrameに直接列を追加する）"""
+
+        # 天気のエンコーディング（表記ゆれを寄せてからカテゴリコード化。
+        # Categorical.codesはC実装のハッシュ参照でint8を直接返す）
         if '天気' in df.columns:
-            df['天気_エンコード'] = df['天気'].map(weather_mapping)
-            df['天気_エンコード'] = df['天気_エンコード'].fillna(1)  # 不明は曇りとする
-        
+            weather = df['天気'].replace({'晴': '晴れ', '曇': '曇り'})
+            codes = pd.Categorical(weather, categories=WEATHER_CATS).codes
+            df['天気_エンコード'] = np.where(codes < 0, 1, codes).astype('int8')  # 不明は曇りとする
+
         # 潮のエンコーディング（カラム名は'潮'）
-        tide_mapping = {
-            '大潮': 0,
-            '中潮': 1,
-            '小潮': 2,
-            '長潮': 3,
-            '若潮': 4
-        }
         if '潮' in df.columns:
-            df['潮_エンコード'] = df['潮'].map(tide_mapping)
-            df['潮_エンコード'] = df['潮_エンコード'].fillna(1)  # 不明は中潮とする
-        
-        # 季節のエンコーディング
-        season_mapping = {'春': 0, '夏': 1, '秋': 2, '冬': 3}
-        df['季節_エンコード'] = df['季節'].map(season_mapping)
-        
-        # エンコーディング情報を保存
+            codes = pd.Categorical(df['潮'], categories=TIDE_CATS).codes
+            df['潮_エンコード'] = np.where(codes < 0, 1, codes).astype('int8')  # 不明は中潮とする
+
+        # 季節のエンコーディング（create_time_featuresの出力なので必ず4種のいずれか）
+        df['季節_エンコード'] = pd.Categorical(df['季節'], categories=SEASON_CATS).codes
+
+        # エンコーディング情報を保存（コード値はカテゴリ配列の添字）
         self.categorical_encoders = {
-            '天気': weather_mapping,
-            '潮': tide_mapping,
-            '季節': season_mapping
+            '天気': WEATHER_CATS,
+            '潮': TIDE_CATS,
+            '季節': SEASON_CATS
         }
-        
+
         return df
     
     def create_environmental_features(self, df):
-        """環境関連特徴量の作成"""
-        df = df.copy()
-        
+        """環境関連特徴量の作成（引数のDataFrameを直接変更する）"""
+
         # 水温を数値型に変換してから階級化
-        if '水温' in df.columns:
+        # （data_loader側で数値化済みならO(N)の再変換をスキップ）
+        if '水温' in df.columns and not pd.api.types.is_numeric_dtype(df['水温']):
             # 文字列の場合は数値に変換
             df['水温'] = pd.to_numeric(df['水温'], errors='coerce')
             # 水温の階級化（5度刻み） - 削除対象なのでコメントアウト
@@ -187,41 +181,42 @@ class AjiFishingFeatureEngineer:
         print(f"🔍 利用可能なカラム名:")
         print(aji_df.columns.tolist())
         
-        # 日付から曜日部分を除去してdatetime型に変換
-        def clean_date(date_str):
-            if isinstance(date_str, str):
-                # '2025/01/31(金)' → '2025/01/31'
-                return date_str.split('(')[0]
-            return date_str
-        
-        aji_df['日付_クリーン'] = aji_df['日付'].apply(clean_date)
-        aji_df['日付'] = pd.to_datetime(aji_df['日付_クリーン'], errors='coerce')
-        
-        # 存在するカラムのみでグループ化
-        agg_dict = {'釣果数': 'sum'}
+        # パース済み列があれば使い回し、なければ一括変換
+        if '日付_parsed' in aji_df.columns:
+            aji_df['日付'] = aji_df['日付_parsed']
+        elif not pd.api.types.is_datetime64_any_dtype(aji_df['日付']):
+            aji_df['日付'] = _clean_dates(aji_df['日付'])
         
-        # 存在するカラムを確認して追加（数値化されたカラムを優先使用）
+        # 存在するカラムを確認（数値化されたカラムを優先使用）
         column_mapping = {
             '天気': '天気',
             '水温': '水温_数値' if '水温_数値' in aji_df.columns else '水温',
             '潮': '潮',
             '来場者数': '来場者数_数値' if '来場者数_数値' in aji_df.columns else '来場者数'
         }
-        
+
+        ctx_cols = []
         for original_col, actual_col in column_mapping.items():
             if actual_col in aji_df.columns:
-                agg_dict[original_col] = 'first'
+                # 数値化カラムを元のカラム名にリネーム
+                if actual_col != original_col:
+                    aji_df[original_col] = aji_df[actual_col]
+                ctx_cols.append(original_col)
                 print(f"✅ カラム '{actual_col}' を '{original_col}' として追加")
             else:
                 print(f"⚠️ カラム '{actual_col}' は存在しません")
-        
-        # 日付でグループ化して、1日あたりの合計釣果数を計算
-        # 数値化カラムを元のカラム名にリネーム
-        for original_col, actual_col in column_mapping.items():
-            if actual_col in aji_df.columns and actual_col != original_col:
-                aji_df[original_col] = aji_df[actual_col]
-        
-        daily_aji = aji_df.groupby('日付').agg(agg_dict).reset_index()
+
+        # 1日あたりの合計釣果数はCython高速パスのsumで集計。
+        # 天気・水温などは日単位で共通の環境値なので、'first'集約の
+        # 代わりにdrop_duplicates('日付')した行をmergeで付ける
+        totals = aji_df.groupby('日付', sort=False, as_index=False)['釣果数'].sum()
+        ctx = aji_df.drop_duplicates('日付')[['日付'] + ctx_cols]
+        daily_aji = totals.merge(ctx, on='日付', how='left')
+
+        # sort=Falseは出現順を保つだけなので、バックフィル等で元データが
+        # 日付順でない場合に備えて明示的に時系列順へ並べ直す
+        # （fitの前後分割やTimeSeriesSplitは日付順の行を前提にしている）
+        daily_aji = daily_aji.sort_values('日付', ignore_index=True)
         
         print(f"✅ 日別データ作成完了: {len(daily_aji)}行")
         print(f"📋 作成されたカラム: {daily_aji.columns.tolist()}")
@@ -242,13 +237,21 @@ class AjiFishingFeatureEngineer:
         """
         print(f"🔧 {self.target_species}特徴量エンジニアリング開始（削減版）")
         print("=" * 50)
-        
+
+        # 日付パースはここで1回だけ行い、下流の各ステージには
+        # 日付_parsed列として渡す（analyze→集計→時間特徴量で
+        # 同じ文字列列を3回パースしていたのを1回に統合）
+        if '日付_parsed' not in fishing_df.columns:
+            fishing_df = fishing_df.assign(日付_parsed=_clean_dates(fishing_df['日付']))
+
         # アジデータ分析
         aji_data = self.analyze_aji_data(fishing_df)
         if aji_data is None:
             return None, None
         
         # アジの日別集計データを作成
+        # （groupby集計で新規に作られるフレームなので、以降の各ステージは
+        #   コピーせずそのまま列を足していく。中間コピー4回分が不要になる）
         print(f"\n📊 日別{self.target_species}データ集計中...")
         daily_aji = self.create_target_variable(fishing_df)
         print(f"✅ 日別データ作成完了: {len(daily_aji)}行")
@@ -280,8 +283,27 @@ class AjiFishingFeatureEngineer:
         
         self.feature_columns = feature_columns
         
-        # 欠損値処理
-        X = X.fillna(X.mean())
+        # 欠損値処理（SimpleImputerで列平均を補完。初回fitで求めた平均を
+        # 保存し、2回目以降は再計算せず同じ値で埋める＝学習/推論の一貫性も確保）
+        if self.imputer is None:
+            self.imputer = SimpleImputer(strategy='mean')
+            imputed = self.imputer.fit_transform(X)
+        else:
+            imputed = self.imputer.transform(X)
+        X = pd.DataFrame(imputed, columns=X.columns, index=X.index)
+
+        # モデルへ渡す前に省メモリな型へ統一
+        # （エンコード済みカテゴリと月はint8、連続値はfloat32で十分。
+        #   sklearnが内部コピーするバイト数が1/4〜1/8になる）
+        X = X.astype({
+            '月': 'int8',
+            '季節_エンコード': 'int8',
+            '天気_エンコード': 'int8',
+            '潮_エンコード': 'int8',
+            '水温': 'float32',
+            '来場者数': 'float32'
+        })
+        y = y.astype('float32')
         
         print(f"\n✅ 特徴量エンジニアリング完了（削減版）")
         print(f"📊 特徴量数: {X.shape[1]} （10個→6個に削減）")
@@ -310,6 +332,7 @@ class AjiFishingFeatureEngineer:
             'target_species': self.target_species,
             'feature_columns': self.feature_columns,
             'categorical_encoders': self.categorical_encoders,
+            'imputer': self.imputer,
             'n_features': len(self.feature_columns)
         }
 
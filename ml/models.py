@@ -11,45 +11,69 @@
 """
 
 import os
-import glob
+import json
 import numpy as np
 import pandas as pd
 import joblib
 from datetime import datetime
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split, TimeSeriesSplit, cross_val_score
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.model_selection import train_test_split, TimeSeriesSplit
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
-import xgboost as xgb
+# xgboostはC++共有ライブラリのロードにimportだけで数百ms掛かるため、
+# モデル種別がxgboostのときだけ各分岐内で遅延importする
+
+def _fit_and_score_fold(model, X_train, y_train, X_val, y_val):
+    """交差検証1fold分の訓練と評価（並列実行用ワーカー）
+
+    1回のfitと1回のpredictからMAEとR²を両方計算する。
+    """
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_val)
+    mae = mean_absolute_error(y_val, y_pred)
+    r2 = r2_score(y_val, y_pred)
+    return mae, r2
 
 class AjiPredictor:
     """アジ釣果予測クラス"""
     
-    def __init__(self, model_type='xgboost'):
+    def __init__(self, model_type='xgboost', verbose=True):
         """
         初期化
         
         Args:
-            model_type (str): モデルタイプ ('random_forest' or 'xgboost')
+            model_type (str): モデルタイプ ('random_forest', 'xgboost', 'hgbr')
+            verbose (bool): 進捗・結果のコンソール出力を行うか
         """
         self.model_type = model_type
+        self.verbose = verbose
         self.model = None
         self.feature_columns = None
         self.is_trained = False
+        # treeliteでコンパイルした単発推論用予測器（未導入ならNoneのまま）
+        self._fast_predictor = None
+        # 検証済みの列Indexオブジェクト（predictの列順チェック高速化用）
+        self._validated_columns = None
         
         # モデル保存用ディレクトリ
         self.model_dir = "models"
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
-            print(f"📁 モデル保存ディレクトリ作成: {self.model_dir}")
+            self._log(f"📁 モデル保存ディレクトリ作成: {self.model_dir}")
         
         # 訓練履歴
         self.training_history = {}
         
         # モデル初期化
         self._initialize_model()
+
+    def _log(self, *args, **kwargs):
+        """verbose時のみ出力（チューニングループでのprintコストを回避）"""
+        if self.verbose:
+            print(*args, **kwargs)
     
     def _initialize_model(self):
         """モデルの初期化"""
@@ -62,9 +86,10 @@ class AjiPredictor:
                 random_state=42,
                 n_jobs=-1
             )
-            print(f"🌲 Random Forestモデル初期化完了")
+            self._log(f"🌲 Random Forestモデル初期化完了")
             
         elif self.model_type == 'xgboost':
+            import xgboost as xgb
             self.model = xgb.XGBRegressor(
                 n_estimators=100,
                 max_depth=6,
@@ -72,10 +97,30 @@ class AjiPredictor:
                 subsample=0.8,
                 colsample_bytree=0.8,
                 random_state=42,
-                n_jobs=-1
+                n_jobs=-1,
+                # ヒストグラム法: 分割探索がO(n×ビン数)になり、
+                # 6特徴量程度のデータでは128ビンで精度劣化なし
+                tree_method='hist',
+                max_bin=128,
+                # 検証誤差が10ラウンド改善しなければ打ち切り
+                early_stopping_rounds=10
             )
-            print(f"🚀 XGBoostモデル初期化完了")
-            
+            self._log(f"🚀 XGBoostモデル初期化完了")
+
+        elif self.model_type == 'hgbr':
+            # sklearn純正のヒストグラム勾配ブースティング。
+            # uint8への事前ビン化 + Cython実装でXGBoost hist同等に速く、
+            # 追加依存なしで使える。早期終了は本体に組み込み
+            self.model = HistGradientBoostingRegressor(
+                max_iter=200,
+                max_bins=128,
+                early_stopping=True,
+                validation_fraction=0.2,
+                n_iter_no_change=10,
+                random_state=42
+            )
+            self._log(f"⚡ HistGradientBoostingモデル初期化完了")
+
         else:
             raise ValueError(f"サポートされていないモデル: {self.model_type}")
     
@@ -91,33 +136,43 @@ class AjiPredictor:
         Returns:
             dict: 訓練結果
         """
-        print(f"🎯 {self.model_type}モデル訓練開始")
-        print("=" * 50)
+        self._log(f"🎯 {self.model_type}モデル訓練開始")
+        self._log("=" * 50)
         
         # 入力データの確認
-        print(f"📊 訓練データ: X{X.shape}, y{y.shape}")
-        print(f"📈 釣果数統計: 平均{y.mean():.1f}, 範囲{y.min()}-{y.max()}")
+        self._log(f"📊 訓練データ: X{X.shape}, y{y.shape}")
+        self._log(f"📈 釣果数統計: 平均{y.mean():.1f}, 範囲{y.min()}-{y.max()}")
         
         # 特徴量名を保存
         self.feature_columns = X.columns.tolist()
-        
+
+        # float32のndarrayへ一度だけ変換してから分割
+        # （ilocはブロックマネージャ経由で列のコピーを作るが、
+        #   ndarrayのスライスはビューなので割り当てが発生しない）
+        X_arr = self._to_float32(X)
+        y_arr = self._to_float32(y)
+
         # 時系列分割（過去→未来の順序を保持）
-        train_size = int(len(X) * (1 - validation_split))
-        X_train = X.iloc[:train_size]
-        X_val = X.iloc[train_size:]
-        y_train = y.iloc[:train_size]
-        y_val = y.iloc[train_size:]
+        train_size = int(len(X_arr) * (1 - validation_split))
+        X_train = X_arr[:train_size]
+        X_val = X_arr[train_size:]
+        y_train = y_arr[:train_size]
+        y_val = y_arr[train_size:]
         
-        print(f"📅 時系列分割: 訓練{len(X_train)}行, 検証{len(X_val)}行")
+        self._log(f"📅 時系列分割: 訓練{len(X_train)}行, 検証{len(X_val)}行")
         
         # モデル訓練
-        print(f"🔧 {self.model_type}モデル訓練中...")
+        self._log(f"🔧 {self.model_type}モデル訓練中...")
         start_time = datetime.now()
         
-        self.model.fit(X_train, y_train)
-        
+        if self.model_type == 'xgboost':
+            # 検証データを渡して早期終了を有効化（全100ラウンド回さない）
+            self.model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+        else:
+            self.model.fit(X_train, y_train)
+
         training_time = (datetime.now() - start_time).total_seconds()
-        print(f"✅ 訓練完了（{training_time:.2f}秒）")
+        self._log(f"✅ 訓練完了（{training_time:.2f}秒）")
         
         # 予測実行
         y_train_pred = self.model.predict(X_train)
@@ -138,9 +193,14 @@ class AjiPredictor:
             'feature_columns': self.feature_columns,
             'trained_at': datetime.now().isoformat()
         }
+        if self.model_type == 'xgboost':
+            self.training_history['best_iteration'] = getattr(self.model, 'best_iteration', None)
         
         self.is_trained = True
-        
+
+        # treeliteがあれば単発推論用のネイティブ予測器を用意
+        self._compile_fast_predictor()
+
         # 結果表示
         self._print_training_results()
         
@@ -149,62 +209,120 @@ class AjiPredictor:
         
         return self.training_history
     
+    def _compile_fast_predictor(self):
+        """treeliteで木アンサンブルをネイティブコードへAOTコンパイル
+
+        単発予測（predict_single）ではモデル呼び出しのPythonオーバーヘッド
+        が支配的になる。treeliteが導入されていれば共有ライブラリへ
+        コンパイルしてC関数1回の推論にする。未導入・失敗時は従来経路。
+        """
+        try:
+            import treelite
+            import treelite_runtime
+        except ImportError:
+            self._fast_predictor = None
+            return
+
+        try:
+            if self.model_type == 'xgboost':
+                tl_model = treelite.Model.from_xgboost(self.model.get_booster())
+            elif self.model_type == 'random_forest':
+                tl_model = treelite.Model.from_sklearn(self.model)
+            else:
+                self._fast_predictor = None
+                return
+
+            libpath = os.path.join(self.model_dir, f'aji_{self.model_type}_tl.so')
+            tl_model.export_lib(toolchain='gcc', libpath=libpath,
+                                params={'parallel_comp': 6}, verbose=False)
+            self._fast_predictor = treelite_runtime.Predictor(libpath)
+            self._log(f"⚡ treelite予測器コンパイル完了: {libpath}")
+        except Exception as e:
+            self._log(f"⚠️ treelite予測器コンパイル失敗（通常経路で推論します）: {e}")
+            self._fast_predictor = None
+
+    @staticmethod
+    def _to_float32(data):
+        """特徴量・ターゲットをfloat32の連続メモリndarrayへ変換
+
+        sklearn/XGBoostはDataFrameを渡すと呼び出しごとに検証と
+        float64への変換が走る。先にfloat32へ落としておくことで
+        走査されるバイト数が半分になり、変換も1回で済む。
+        """
+        if isinstance(data, (pd.DataFrame, pd.Series)):
+            return data.to_numpy(dtype=np.float32, copy=False)
+        return np.ascontiguousarray(data, dtype=np.float32)
+
     def _calculate_metrics(self, y_true, y_pred, dataset_name):
-        """評価指標の計算"""
-        mae = mean_absolute_error(y_true, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-        r2 = r2_score(y_true, y_pred)
-        
+        """評価指標の計算
+
+        pandasの統計ディスパッチを通さず、numpy配列に揃えてから
+        計算する。MAE・RMSE・R²を別々のsklearn関数で取ると残差の
+        計算だけで3回データを走査するため、残差を1回作って
+        そこから3指標すべてを導出する。値はJSON保存できるよう
+        Pythonのfloatに落とす。
+        """
+        y_t = np.asarray(y_true, dtype=np.float32)
+        y_p = np.asarray(y_pred, dtype=np.float32)
+
+        residual = y_p - y_t
+        mae = float(np.abs(residual).mean())
+        mse = float((residual * residual).mean())
+        rmse = float(np.sqrt(mse))
+        var = float(y_t.var())
+        r2 = 1.0 - mse / var if var > 0 else 0.0
+
         metrics = {
             'mae': mae,
             'rmse': rmse,
             'r2': r2,
-            'mean_actual': float(y_true.mean()),
-            'mean_predicted': float(y_pred.mean())
+            'mean_actual': float(y_t.mean()),
+            'mean_predicted': float(y_p.mean())
         }
-        
+
         return metrics
     
     def _print_training_results(self):
         """訓練結果の表示"""
-        print(f"\n📊 {self.model_type}モデル評価結果")
-        print("=" * 50)
+        self._log(f"\n📊 {self.model_type}モデル評価結果")
+        self._log("=" * 50)
         
         train_metrics = self.training_history['train_metrics']
         val_metrics = self.training_history['val_metrics']
         
-        print(f"🎯 訓練データ評価:")
-        print(f"  MAE:  {train_metrics['mae']:.1f}匹")
-        print(f"  RMSE: {train_metrics['rmse']:.1f}匹")
-        print(f"  R²:   {train_metrics['r2']:.3f}")
+        self._log(f"🎯 訓練データ評価:")
+        self._log(f"  MAE:  {train_metrics['mae']:.1f}匹")
+        self._log(f"  RMSE: {train_metrics['rmse']:.1f}匹")
+        self._log(f"  R²:   {train_metrics['r2']:.3f}")
         
-        print(f"\n🔍 検証データ評価:")
-        print(f"  MAE:  {val_metrics['mae']:.1f}匹")
-        print(f"  RMSE: {val_metrics['rmse']:.1f}匹")
-        print(f"  R²:   {val_metrics['r2']:.3f}")
+        self._log(f"\n🔍 検証データ評価:")
+        self._log(f"  MAE:  {val_metrics['mae']:.1f}匹")
+        self._log(f"  RMSE: {val_metrics['rmse']:.1f}匹")
+        self._log(f"  R²:   {val_metrics['r2']:.3f}")
         
         # 過学習チェック
         mae_diff = val_metrics['mae'] - train_metrics['mae']
         r2_diff = train_metrics['r2'] - val_metrics['r2']
         
-        print(f"\n🔍 過学習チェック:")
-        print(f"  MAE差分: {mae_diff:+.1f}匹 ({'⚠️過学習' if mae_diff > 50 else '✅良好'})")
-        print(f"  R²差分:  {r2_diff:+.3f} ({'⚠️過学習' if r2_diff > 0.1 else '✅良好'})")
+        self._log(f"\n🔍 過学習チェック:")
+        self._log(f"  MAE差分: {mae_diff:+.1f}匹 ({'⚠️過学習' if mae_diff > 50 else '✅良好'})")
+        self._log(f"  R²差分:  {r2_diff:+.3f} ({'⚠️過学習' if r2_diff > 0.1 else '✅良好'})")
     
     def _print_feature_importance(self):
         """特徴量重要度の表示"""
         if not hasattr(self.model, 'feature_importances_'):
             return
         
-        importance = self.model.feature_importances_
-        feature_importance = pd.DataFrame({
-            '特徴量': self.feature_columns,
-            '重要度': importance
-        }).sort_values('重要度', ascending=False)
-        
-        print(f"\n🔍 特徴量重要度 (上位5位):")
-        for i, (_, row) in enumerate(feature_importance.head(5).iterrows(), 1):
-            print(f"  {i}. {row['特徴量']}: {row['重要度']:.3f}")
+        # DataFrame構築+全体ソートの代わりにargpartitionで上位kだけ抽出
+        # （O(n log n)のソートとpandasオブジェクト生成をfitのたびに行わない）
+        importance = np.asarray(self.model.feature_importances_)
+        k = min(5, importance.size)
+        top_idx = np.argpartition(-importance, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-importance[top_idx])]
+
+        self._log(f"\n🔍 特徴量重要度 (上位{k}位):")
+        for rank, i in enumerate(top_idx, 1):
+            self._log(f"  {rank}. {self.feature_columns[i]}: {importance[i]:.3f}")
     
     def predict(self, X):
         """
@@ -220,16 +338,29 @@ class AjiPredictor:
             raise ValueError("モデルが訓練されていません。先にfit()を実行してください")
         
         # DataFrameの場合は特徴量順序をチェック
+        # （同じパイプラインから繰り返し渡されるフレームは列Indexの
+        #   オブジェクトが同一なので、2回目以降はid比較1回で済む）
         if isinstance(X, pd.DataFrame):
-            if list(X.columns) != self.feature_columns:
-                print("⚠️ 特徴量の順序を調整しています")
-                X = X[self.feature_columns]
-        
-        predictions = self.model.predict(X)
+            if X.columns is not self._validated_columns:
+                if list(X.columns) != self.feature_columns:
+                    self._log("⚠️ 特徴量の順序を調整しています")
+                    X = X[self.feature_columns]
+                else:
+                    self._validated_columns = X.columns
+
+        features = self._to_float32(X)
+        if self._fast_predictor is not None:
+            import treelite_runtime
+            predictions = self._fast_predictor.predict(treelite_runtime.DMatrix(features))
+        else:
+            predictions = self.model.predict(features)
         
         # 負の値を0にクリップ（釣果数は非負）
-        predictions = np.maximum(predictions, 0)
-        
+        # float32に揃えた上でin-placeにクランプし、N要素分の
+        # 新規割り当てを避ける（RFはfloat64で返すことがある）
+        predictions = np.asarray(predictions).astype(np.float32, copy=False)
+        np.clip(predictions, 0, None, out=predictions)
+
         return predictions
     
     def predict_single(self, month, season, weather, temp, tide, visitors):
@@ -247,13 +378,30 @@ class AjiPredictor:
         Returns:
             float: 予測アジ釣果数
         """
-        # 特徴量ベクトル作成（6個の特徴量）
-        features = np.array([[month, season, weather, temp, tide, visitors]])
-        
-        # 予測実行
-        prediction = self.predict(features)[0]
-        
-        return prediction
+        return float(self.predict_batch(
+            month=[month], season=[season], weather=[weather],
+            temp=[temp], tide=[tide], visitors=[visitors]
+        )[0])
+
+    def predict_batch(self, month, season, weather, temp, tide, visitors):
+        """
+        複数条件の一括予測
+
+        条件ごとにpredict_singleを呼ぶと1行ずつの配列構築と
+        モデル呼び出しが繰り返されるため、列をnp.column_stackで
+        一度に(N, 6)のfloat32行列へまとめてモデルに1回渡す。
+
+        Args:
+            month, season, weather, temp, tide, visitors: 各条件の配列（同じ長さ）
+
+        Returns:
+            np.array: 予測アジ釣果数の配列
+        """
+        features = np.column_stack(
+            [month, season, weather, temp, tide, visitors]
+        ).astype(np.float32, copy=False)
+
+        return self.predict(features)
     
     def cross_validate(self, X, y, cv_folds=5):
         """
@@ -267,27 +415,42 @@ class AjiPredictor:
         Returns:
             dict: 交差検証結果
         """
-        print(f"🔄 {cv_folds}-fold交差検証実行中...")
-        
+        self._log(f"🔄 {cv_folds}-fold交差検証実行中...")
+
+        # fold×2指標ぶんの再変換を避けるため先にfloat32配列へ落とす
+        X = self._to_float32(X)
+        y = self._to_float32(y)
+
         # 時系列交差検証
         tscv = TimeSeriesSplit(n_splits=cv_folds)
-        
-        # MAEスコア
-        mae_scores = -cross_val_score(
-            self.model, X, y, 
-            cv=tscv, 
-            scoring='neg_mean_absolute_error',
-            n_jobs=-1
-        )
-        
-        # R²スコア
-        r2_scores = cross_val_score(
-            self.model, X, y,
-            cv=tscv,
-            scoring='r2',
-            n_jobs=-1
+
+        # 交差検証ではeval_setを渡さないため、早期終了設定は外す。
+        # コア数をfold並列とモデル内部スレッドで分け合う
+        # （fold×モデルの両方で-1にするとスレッドが過剰生成されて
+        #   かえって遅くなる）。joblibの既定backend（loky）は
+        #   ワーカープロセスを呼び出し間で再利用する
+        n_cpus = os.cpu_count() or 1
+        n_workers = min(cv_folds, n_cpus)
+        inner_threads = max(1, n_cpus // n_workers)
+
+        estimator = clone(self.model)
+        if self.model_type == 'xgboost':
+            estimator.set_params(early_stopping_rounds=None)
+        if 'n_jobs' in estimator.get_params():
+            estimator.set_params(n_jobs=inner_threads)
+
+        # MAEとR²を別々のcross_val_scoreで取ると同じfoldを2回
+        # fitすることになるため、1回のfit+predictから両指標を計算する
+        fold_scores = joblib.Parallel(n_jobs=n_workers, prefer='processes')(
+            joblib.delayed(_fit_and_score_fold)(
+                clone(estimator), X[train_idx], y[train_idx], X[val_idx], y[val_idx]
+            )
+            for train_idx, val_idx in tscv.split(X)
         )
-        
+        scores = np.asarray(fold_scores)
+        mae_scores = scores[:, 0]
+        r2_scores = scores[:, 1]
+
         cv_results = {
             'mae_mean': mae_scores.mean(),
             'mae_std': mae_scores.std(),
@@ -297,12 +460,43 @@ class AjiPredictor:
             'r2_scores': r2_scores.tolist()
         }
         
-        print(f"✅ 交差検証完了:")
-        print(f"  MAE: {cv_results['mae_mean']:.1f} ± {cv_results['mae_std']:.1f}匹")
-        print(f"  R²:  {cv_results['r2_mean']:.3f} ± {cv_results['r2_std']:.3f}")
+        self._log(f"✅ 交差検証完了:")
+        self._log(f"  MAE: {cv_results['mae_mean']:.1f} ± {cv_results['mae_std']:.1f}匹")
+        self._log(f"  R²:  {cv_results['r2_mean']:.3f} ± {cv_results['r2_std']:.3f}")
         
         return cv_results
     
+    def _index_path(self):
+        """モデル索引ファイルのパスを取得"""
+        return os.path.join(self.model_dir, '_index.json')
+
+    def _load_index(self):
+        """モデル索引（filename→保存時刻）を読み込み
+
+        索引がない・壊れている場合はディレクトリを一度だけ走査して
+        再構築する。以降の保存・クリーンアップはこの索引だけを見るため、
+        ファイル名から日時をパースし直す必要がなくなる。
+        """
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entries = []
+            for e in os.scandir(self.model_dir):
+                if (e.name.startswith('aji_')
+                        and e.name.endswith(('.pkl', '.json'))
+                        and not e.name.endswith('.meta.json')):
+                    ts = datetime.fromtimestamp(e.stat().st_mtime).isoformat()
+                    entries.append({'filename': e.name, 'ts': ts})
+            return entries
+
+    def _save_index(self, entries):
+        """モデル索引をアトミックに書き込み（書きかけの索引を残さない）"""
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._index_path())
+
     def cleanup_old_models(self, keep_count=2):
         """
         古いモデルファイルを削除し、最新のkeep_count個のみ保持
@@ -313,48 +507,47 @@ class AjiPredictor:
         Returns:
             dict: 削除・保持結果
         """
-        # モデル種別別のファイルパターン
-        pattern = os.path.join(self.model_dir, f"aji_{self.model_type}_*.pkl")
-        model_files = glob.glob(pattern)
-        
-        if len(model_files) <= keep_count:
+        # 索引からモデル種別ごとのエントリを取得
+        # （ディレクトリ走査もファイル名からの日時パースも不要になる）
+        prefix = f"aji_{self.model_type}_"
+        index = self._load_index()
+        own_entries = [e for e in index if e['filename'].startswith(prefix)]
+
+        if len(own_entries) <= keep_count:
             return {
                 'deleted_files': [],
-                'kept_files': model_files,
+                'kept_files': [e['filename'] for e in own_entries],
                 'message': f"保持対象{keep_count}個以下のため削除不要"
             }
-        
-        # ファイル名から日時を抽出してソート（新しい順）
-        def extract_datetime(filepath):
-            filename = os.path.basename(filepath)
-            # aji_random_forest_20250730_163124.pkl → 20250730_163124
-            try:
-                datetime_part = filename.split('_')[-2] + '_' + filename.split('_')[-1].replace('.pkl', '')
-                return datetime.strptime(datetime_part, '%Y%m%d_%H%M%S')
-            except:
-                # 日時抽出失敗時はファイル作成時刻を使用
-                return datetime.fromtimestamp(os.path.getctime(filepath))
-        
-        # 日時順ソート（新しい順）
-        model_files.sort(key=extract_datetime, reverse=True)
-        
-        # 保持・削除ファイルを決定
-        files_to_keep = model_files[:keep_count]
-        files_to_delete = model_files[keep_count:]
-        
+
+        # 保存時刻順ソート（新しい順）で保持・削除を決定
+        own_entries.sort(key=lambda e: e['ts'], reverse=True)
+        entries_to_keep = own_entries[:keep_count]
+        entries_to_delete = own_entries[keep_count:]
+
         deleted_files = []
-        for file_path in files_to_delete:
+        for entry in entries_to_delete:
+            file_path = os.path.join(self.model_dir, entry['filename'])
             try:
-                os.remove(file_path)
-                deleted_files.append(os.path.basename(file_path))
-                print(f"🗑️  削除: {os.path.basename(file_path)}")
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                # XGBoostネイティブ形式のメタデータも一緒に削除
+                meta_path = file_path + '.meta.json'
+                if os.path.exists(meta_path):
+                    os.remove(meta_path)
+                deleted_files.append(entry['filename'])
+                self._log(f"🗑️  削除: {entry['filename']}")
             except Exception as e:
-                print(f"⚠️  削除失敗: {os.path.basename(file_path)} - {e}")
-        
+                self._log(f"⚠️  削除失敗: {entry['filename']} - {e}")
+
+        # 削除済みエントリを索引から除いて書き戻す
+        deleted_set = set(deleted_files)
+        self._save_index([e for e in index if e['filename'] not in deleted_set])
+
         return {
             'deleted_files': deleted_files,
-            'kept_files': [os.path.basename(f) for f in files_to_keep],
-            'message': f"{len(deleted_files)}個のファイルを削除、{len(files_to_keep)}個を保持"
+            'kept_files': [e['filename'] for e in entries_to_keep],
+            'message': f"{len(deleted_files)}個のファイルを削除、{len(entries_to_keep)}個を保持"
         }
     
     def save_model(self, filename=None):
@@ -369,34 +562,52 @@ class AjiPredictor:
         """
         if not self.is_trained:
             raise ValueError("訓練されていないモデルは保存できません")
-        
+
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"aji_{self.model_type}_{timestamp}.pkl"
-        
+            ext = 'json' if self.model_type == 'xgboost' else 'pkl'
+            filename = f"aji_{self.model_type}_{timestamp}.{ext}"
+
         filepath = os.path.join(self.model_dir, filename)
-        
-        # モデルとメタデータを保存
-        model_data = {
-            'model': self.model,
+
+        # メタデータ（特徴量名・訓練履歴など）
+        metadata = {
             'model_type': self.model_type,
             'feature_columns': self.feature_columns,
             'training_history': self.training_history,
             'is_trained': self.is_trained
         }
-        
-        joblib.dump(model_data, filepath)
-        print(f"💾 モデル保存完了: {filepath}")
-        
+
+        if filepath.endswith('.json'):
+            # XGBoostはネイティブ形式で保存
+            # （pickleを経由せず木構造だけを書くのでファイルが小さく、
+            #   XGBoostのバージョン間でも安定して読み込める）
+            self.model.save_model(filepath)
+            with open(filepath + '.meta.json', 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, default=float)
+        else:
+            # Random Forestはjoblibで圧縮保存
+            # （sklearnの木はint64配列が大きいのでzlib圧縮でディスクI/Oを削減）
+            model_data = dict(metadata, model=self.model)
+            # protocol 5はnumpy配列をアウトオブバンドバッファで書き、
+            # pickleストリームへのコピー1回分を省く
+            joblib.dump(model_data, filepath, compress=3, protocol=5)
+        self._log(f"💾 モデル保存完了: {filepath}")
+
+        # 索引に登録（クリーンアップはこの索引を参照する）
+        index = self._load_index()
+        index.append({'filename': filename, 'ts': datetime.now().isoformat()})
+        self._save_index(index)
+
         # 古いモデルファイルのクリーンアップ
-        print("🧹 古いモデルファイルをクリーンアップ中...")
+        self._log("🧹 古いモデルファイルをクリーンアップ中...")
         cleanup_result = self.cleanup_old_models(keep_count=2)
         
         if cleanup_result['deleted_files']:
-            print(f"✅ クリーンアップ完了: {cleanup_result['message']}")
-            print(f"   📁 保持ファイル: {', '.join(cleanup_result['kept_files'])}")
+            self._log(f"✅ クリーンアップ完了: {cleanup_result['message']}")
+            self._log(f"   📁 保持ファイル: {', '.join(cleanup_result['kept_files'])}")
         else:
-            print(f"ℹ️  {cleanup_result['message']}")
+            self._log(f"ℹ️  {cleanup_result['message']}")
         
         return filepath
     
@@ -407,20 +618,27 @@ class AjiPredictor:
         Returns:
             list: モデルファイル情報のリスト
         """
-        pattern = os.path.join(self.model_dir, "aji_*.pkl")
-        model_files = glob.glob(pattern)
-        
+        # scandirで1パス走査し、サイズ・更新時刻はキャッシュ済みstatから取る
+        model_entries = [e for e in os.scandir(self.model_dir)
+                         if e.name.startswith("aji_")
+                         and e.name.endswith(('.pkl', '.json'))
+                         and not e.name.endswith('.meta.json')]
+
         model_info = []
-        for filepath in model_files:
-            filename = os.path.basename(filepath)
-            file_size = os.path.getsize(filepath)
-            modified_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-            
+        for entry in model_entries:
+            filename = entry.name
+            filepath = entry.path
+            st = entry.stat()
+            file_size = st.st_size
+            modified_time = datetime.fromtimestamp(st.st_mtime)
+
             # モデル種別を推定
             if 'random_forest' in filename:
                 model_type = 'Random Forest'
             elif 'xgboost' in filename:
                 model_type = 'XGBoost'
+            elif 'hgbr' in filename:
+                model_type = 'HistGradientBoosting'
             else:
                 model_type = 'Unknown'
             
@@ -435,14 +653,14 @@ class AjiPredictor:
         # 更新日時順ソート（新しい順）
         model_info.sort(key=lambda x: x['modified'], reverse=True)
         
-        print(f"\n📁 保存済みモデル一覧 ({len(model_info)}個)")
-        print("=" * 80)
+        self._log(f"\n📁 保存済みモデル一覧 ({len(model_info)}個)")
+        self._log("=" * 80)
         for i, info in enumerate(model_info, 1):
-            print(f"{i:2d}. {info['filename']}")
-            print(f"    📊 種別: {info['model_type']}")
-            print(f"    📂 サイズ: {info['size_mb']:.1f}MB")
-            print(f"    📅 更新: {info['modified'].strftime('%Y/%m/%d %H:%M:%S')}")
-            print()
+            self._log(f"{i:2d}. {info['filename']}")
+            self._log(f"    📊 種別: {info['model_type']}")
+            self._log(f"    📂 サイズ: {info['size_mb']:.1f}MB")
+            self._log(f"    📅 更新: {info['modified'].strftime('%Y/%m/%d %H:%M:%S')}")
+            self._log()
         
         return model_info
     
@@ -458,25 +676,38 @@ class AjiPredictor:
         """
         try:
             if not os.path.exists(filepath):
-                print(f"❌ モデルファイルが見つかりません: {filepath}")
+                self._log(f"❌ モデルファイルが見つかりません: {filepath}")
                 return False
             
-            model_data = joblib.load(filepath)
-            
+            if filepath.endswith('.json'):
+                # XGBoostネイティブ形式 + サイドカーのメタデータJSON
+                import xgboost as xgb
+                model = xgb.XGBRegressor()
+                model.load_model(filepath)
+                with open(filepath + '.meta.json', 'r', encoding='utf-8') as f:
+                    model_data = json.load(f)
+                model_data['model'] = model
+
+            else:
+                model_data = joblib.load(filepath)
+
             self.model = model_data['model']
             self.model_type = model_data['model_type']
             self.feature_columns = model_data['feature_columns']
             self.training_history = model_data['training_history']
             self.is_trained = model_data['is_trained']
             
-            print(f"✅ モデル読み込み完了: {filepath}")
-            print(f"📊 モデル: {self.model_type}")
-            print(f"🎯 特徴量数: {len(self.feature_columns)}")
-            
+            self._log(f"✅ モデル読み込み完了: {filepath}")
+            self._log(f"📊 モデル: {self.model_type}")
+            self._log(f"🎯 特徴量数: {len(self.feature_columns)}")
+
+            # 読み込んだモデルでも高速予測器を再コンパイル
+            self._compile_fast_predictor()
+
             return True
             
         except Exception as e:
-            print(f"❌ モデル読み込みエラー: {e}")
+            self._log(f"❌ モデル読み込みエラー: {e}")
             return False
     
     def get_model_info(self):
@@ -520,21 +751,24 @@ def select_model_type():
     print("🤖 使用するモデルを選択してください:")
     print("  1. Random Forest（安定性重視・解釈しやすい）")
     print("  2. XGBoost（高精度・競技向け）")
-    
+    print("  3. HistGradientBoosting（sklearn純正・軽量高速）")
+
     while True:
         try:
-            choice = input("\n選択 (1 or 2): ").strip()
+            choice = input("\n選択 (1-3): ").strip()
             if choice == "1":
                 return "random_forest"
             elif choice == "2":
                 return "xgboost"
+            elif choice == "3":
+                return "hgbr"
             else:
-                print("❌ 1 または 2 を入力してください")
+                print("❌ 1〜3 を入力してください")
         except KeyboardInterrupt:
             print("\n\n👋 処理を中断しました")
             exit(0)
         except Exception:
-            print("❌ 無効な入力です。1 または 2 を入力してください")
+            print("❌ 無効な入力です。1〜3 を入力してください")
 
 
 def main():
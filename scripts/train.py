@@ -13,6 +13,8 @@
 import sys
 import os
 import argparse
+import hashlib
+import joblib
 from datetime import datetime
 from pathlib import Path
 
@@ -143,17 +145,48 @@ class TrainingPipeline:
                 selected_type = 'random_forest'
             elif self.model_type == 'xgb':
                 selected_type = 'xgboost'
+            elif self.model_type == 'hgbr':
+                selected_type = 'hgbr'
             else:
                 print(f"❌ Step 4エラー: サポートされていないモデル: {self.model_type}")
                 return False
             
+            # 特徴量シグネチャ（列構成・行数・釣果合計）が同じ学習済み
+            # モデルがあれば再訓練せずキャッシュから読み込む。
+            # データが変われば行数か釣果合計が変わり、シグネチャも変わる
+            signature = hashlib.sha256(
+                (','.join(self.X.columns) + f'|{len(self.X)}|{int(self.y.sum())}').encode()
+            ).hexdigest()[:12]
+            cache_dir = os.path.join('models', '.cache')
+            cache_path = os.path.join(cache_dir, f'{signature}_{selected_type}.pkl')
+
+            if os.path.exists(cache_path):
+                try:
+                    self.predictor = joblib.load(cache_path)
+                    print(f"✅ Step 4完了: 同一データの学習済みモデルを再利用")
+                    print(f"   📁 キャッシュ: {cache_path}")
+                    return True
+                except Exception as e:
+                    print(f"⚠️  モデルキャッシュ読み込み失敗（再訓練します）: {e}")
+
             # モデル訓練
             self.predictor = AjiPredictor(model_type=selected_type)
             training_results = self.predictor.fit(self.X, self.y)
-            
+
             if training_results is None:
                 return False
-            
+
+            # 次回同一データでの実行用にキャッシュ
+            # （treeliteのコンパイル済み予測器はpickleできないため外して保存）
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                fast_predictor = self.predictor._fast_predictor
+                self.predictor._fast_predictor = None
+                joblib.dump(self.predictor, cache_path, compress=3)
+                self.predictor._fast_predictor = fast_predictor
+            except Exception as e:
+                print(f"⚠️  モデルキャッシュ保存失敗: {e}")
+
             print(f"✅ Step 4完了: モデル訓練成功")
             return True
             
@@ -288,9 +321,9 @@ def main():
     
     parser.add_argument(
         '--model', '-m',
-        choices=['rf', 'xgb', 'auto'],
+        choices=['rf', 'xgb', 'hgbr', 'auto'],
         default='auto',
-        help='使用するモデル (rf: Random Forest, xgb: XGBoost, auto: 実行時選択 [デフォルト])'
+        help='使用するモデル (rf: Random Forest, xgb: XGBoost, hgbr: HistGradientBoosting, auto: 実行時選択 [デフォルト])'
     )
     
     parser.add_argument(
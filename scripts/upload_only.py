@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本牧海釣り施設 CSV再投入処理（コマンドライン用）
+スクレイピング済みCSVをGoogle Sheetsへ投入するだけの軽量スクリプト。
+web_scraper.pyが終了コード2（Sheets投入のみ失敗）で終わったとき、
+Chromeを起動し直さずに残っているCSVから投入をリトライできる。
+"""
+
+import argparse
+import json
+import sys
+import os
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='本牧海釣り施設 スクレイピング済みCSVのGoogle Sheets再投入')
+    parser.add_argument('fishing_csv', help='釣果データCSVファイル（.gz可）')
+    parser.add_argument('comment_csv', help='コメントCSVファイル（.gz可）')
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help='1回のAPI呼び出しで追記する行数（デフォルト: 5000）')
+    parser.add_argument('--json', action='store_true',
+                        help='結果をJSONで標準出力に出す（CI/cron向け）')
+
+    args = parser.parse_args()
+
+    for path in (args.fishing_csv, args.comment_csv):
+        if not os.path.exists(path):
+            print(f"❌ ファイルが見つかりません: {path}")
+            sys.exit(3)
+
+    # Google APIクライアント等の重いimportはバリデーション通過後に行う
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from api.scraping_core import upload_to_google_sheets_func
+
+    print("📤 Google Sheets再投入処理開始")
+    result = upload_to_google_sheets_func(
+        args.fishing_csv,
+        args.comment_csv,
+        batch_size=args.batch_size
+    )
+
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, default=str)
+        sys.stdout.write('\n')
+        sys.exit(0 if result.get('success') else 2)
+
+    if result.get('success'):
+        print("✅ Google Sheets投入: 成功")
+        if 'message' in result:
+            print(f"   {result['message']}")
+        if 'spreadsheet_url' in result:
+            print(f"🔗 スプレッドシートURL: {result['spreadsheet_url']}")
+        sys.exit(0)
+    else:
+        print("❌ Google Sheets投入: 失敗")
+        if 'error' in result:
+            print(f"   エラー: {result['error']}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
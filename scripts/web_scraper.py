@@ -6,98 +6,241 @@ api/scraping_core.py の共通処理を呼び出す - Google Sheets投入機能
 """
 
 import argparse
+import json
+import re
 import sys
 import os
 from datetime import datetime
 
-# プロジェクトルートをパスに追加（api/scraping_core.pyをインポートできるように）
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# 年月指定の形式チェック（202513のような存在しない月も弾く）
+_YEAR_MONTH_RE = re.compile(r'(20\d{2})(0[1-9]|1[0-2])')
+
+# 表示用の区切り線（呼び出しの度に組み立てない）
+_SEPARATOR = '=' * 60
+
+# 終了コード: 0=成功, 1=スクレイピング失敗, 2=Sheets投入のみ失敗,
+# 3=引数エラー, 4=データなし。コード2のときはCSVが残っているため、
+# リトライはscripts/upload_only.pyでSeleniumなしに再投入できる
+EXIT_OK = 0
+EXIT_SCRAPE_FAILED = 1
+EXIT_SHEETS_FAILED = 2
+EXIT_INVALID_ARGS = 3
+EXIT_NO_DATA = 4
+
+
+def expand_year_months(tokens):
+    """年月指定を月リストに展開
+
+    YYYYMM の単体指定に加えて YYYYMM-YYYYMM の範囲指定
+    （例: 202401-202412）を受け付ける。
+
+    Returns:
+        list: YYYYMM文字列のリスト / 形式エラー時はNone
+    """
+    months = []
+    for token in tokens:
+        if '-' in token:
+            parts = token.split('-')
+            if len(parts) != 2 or not all(_YEAR_MONTH_RE.fullmatch(p) for p in parts):
+                return None
+            year, month = int(parts[0][:4]), int(parts[0][4:])
+            end_year, end_month = int(parts[1][:4]), int(parts[1][4:])
+            while (year, month) <= (end_year, end_month):
+                months.append(f"{year}{month:02d}")
+                month += 1
+                if month > 12:
+                    year += 1
+                    month = 1
+        else:
+            if not _YEAR_MONTH_RE.fullmatch(token):
+                return None
+            months.append(token)
+
+    # 逆順の範囲指定（202403-202401等）は1か月も展開されない。
+    # 空リストを返すと後段でIndexErrorになるため形式エラー扱いにする
+    if not months:
+        return None
+    return months
+
+
+def _result_exit_code(result, upload_to_sheets):
+    """1か月分のresultを終了コードに変換する"""
+    if not result.get('success'):
+        return EXIT_SCRAPE_FAILED
+    if upload_to_sheets and not result.get('sheets_result', {}).get('success'):
+        return EXIT_SHEETS_FAILED
+    if result.get('total_records', 0) == 0 and not result.get('unchanged'):
+        return EXIT_NO_DATA
+    return EXIT_OK
 
-from api.scraping_core import run_scraping
 
 def main():
     """メイン処理"""
     parser = argparse.ArgumentParser(description='本牧海釣り施設 スクレイピング処理 + Google Sheets投入')
-    parser.add_argument('year_month', nargs='?', help='対象年月 (例: 202507, 省略時は当月)')
+    parser.add_argument('year_month', nargs='*',
+                        help='対象年月 (例: 202507 / 範囲指定: 202401-202412, 省略時は当月)')
     parser.add_argument('--headless', action='store_true', help='ヘッドレスモード')
+    parser.add_argument('--concurrency', type=int, default=2,
+                        help='複数月指定時の並列Chrome数（デフォルト: 2）')
     parser.add_argument('--no-sheets', action='store_true', help='Google Sheets投入をスキップ（CSVのみ出力）')
-    
+    parser.add_argument('--keep-csv', action='store_true',
+                        help='Sheets投入成功後もCSVファイルを削除せず残す')
+    parser.add_argument('--force', action='store_true',
+                        help='前回実行から内容が同じでもCSV出力とSheets投入を実行')
+    parser.add_argument('--no-cache', action='store_true', help='抽出済み月次データのキャッシュを使わず再スクレイピング')
+    parser.add_argument('--cache-ttl', type=int, default=900, help='当月キャッシュの有効期間（秒、デフォルト: 900）')
+    parser.add_argument('--legacy-extract', action='store_true',
+                        help='一括JS抽出を使わず要素単位の抽出を行う（検証用）')
+    parser.add_argument('--nav-timeout', type=int, default=15,
+                        help='ページ遷移・検索結果待ちのタイムアウト（秒、デフォルト: 15）')
+    parser.add_argument('--no-block-assets', action='store_true',
+                        help='画像・フォント・解析タグのCDPブロックを無効化（デフォルトは有効）')
+    parser.add_argument('--json', action='store_true',
+                        help='結果サマリーをJSONで標準出力に出す（CI/cron向け）')
+
     args = parser.parse_args()
     
     # 当月を取得
     current_date = datetime.now()
     current_year_month = current_date.strftime('%Y%m')
     
-    # 引数が省略された場合の処理
-    target_year_month = args.year_month if args.year_month else current_year_month
-    
-    # 年月形式の簡単なバリデーション
-    if len(target_year_month) != 6:
-        print("❌ 年月の形式が正しくありません。YYYYMM形式で入力してください（例: 202507）")
-        sys.exit(1)
-    
-    try:
-        int(target_year_month)
-    except ValueError:
-        print("❌ 年月は数字で入力してください（例: 202507）")
-        sys.exit(1)
-    
-    # 自動選択された場合の表示
+    # 引数が省略された場合は当月のみを対象にする
     auto_selected = not args.year_month
-    
+    target_months = expand_year_months(args.year_month) if args.year_month else [current_year_month]
+
+    if target_months is None:
+        print("❌ 年月の形式が正しくありません。YYYYMM形式で入力してください（例: 202507 / 202401-202412）")
+        sys.exit(EXIT_INVALID_ARGS)
+
     print("🎣 本牧海釣り施設 Webスクレイピング（コマンドライン版）")
-    print("=" * 60)
+    print(_SEPARATOR)
     if auto_selected:
         print(f"📅 自動選択: 当月 ({current_year_month})")
-    print(f"対象年月: {target_year_month}")
+    print(f"対象年月: {', '.join(target_months)}")
     print(f"モード: {'ヘッドレス' if args.headless else '通常'}")
     print(f"Google Sheets投入: {'無効' if args.no_sheets else '有効'}")
-    print("=" * 60)
-    
+    if len(target_months) > 1:
+        print(f"並列Chrome数: {args.concurrency}")
+    print(_SEPARATOR)
+
     # Google Sheets投入フラグ（--no-sheetsが指定された場合はFalse）
     upload_to_sheets = not args.no_sheets
-    
-    # 共通スクレイピング処理を実行
+
+    # seleniumやGoogle API等の重いimportはバリデーション通過後に行う
+    # （--helpや年月の形式エラーで即終了するパスが数msで返る）
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from api.scraping_core import run_scraping, run_scraping_multi
+
+    # 複数月指定時: 各月を別Chromeで並列スクレイピングし、Sheets投入は直列化される
+    if len(target_months) > 1:
+        results = run_scraping_multi(
+            target_months,
+            headless=args.headless,
+            upload_to_sheets=upload_to_sheets,
+            max_workers=args.concurrency,
+            use_cache=not args.no_cache,
+            cache_ttl_sec=args.cache_ttl,
+            keep_csv=args.keep_csv,
+            force=args.force,
+            legacy_extract=args.legacy_extract,
+            nav_timeout=args.nav_timeout,
+            block_assets=not args.no_block_assets
+        )
+
+        codes = [_result_exit_code(r, upload_to_sheets) for r in results]
+        # 重い失敗を優先して全体の終了コードにする
+        if EXIT_SCRAPE_FAILED in codes:
+            exit_code = EXIT_SCRAPE_FAILED
+        elif EXIT_SHEETS_FAILED in codes:
+            exit_code = EXIT_SHEETS_FAILED
+        elif EXIT_NO_DATA in codes:
+            exit_code = EXIT_NO_DATA
+        else:
+            exit_code = EXIT_OK
+
+        if args.json:
+            json.dump(dict(zip(target_months, results)), sys.stdout,
+                      ensure_ascii=False, default=str)
+            sys.stdout.write('\n')
+            sys.exit(exit_code)
+
+        # サマリーは1回のwriteでまとめて出力する
+        # （並列ワーカーのログと行単位で混ざらないようにする）
+        lines = ["", _SEPARATOR, "📊 複数月スクレイピング結果", _SEPARATOR]
+        failed = 0
+        for ym, result in zip(target_months, results):
+            if result.get('success'):
+                lines.append(f"✅ {ym}: {result.get('total_records', 0)}件")
+            else:
+                failed += 1
+                lines.append(f"❌ {ym}: {result.get('error', '不明なエラー')}")
+        lines.append(_SEPARATOR)
+
+        if failed:
+            lines.append(f"❌ {failed}/{len(target_months)}か月の処理が失敗しました")
+        else:
+            lines.append(f"✅ 全{len(target_months)}か月の処理が正常に完了しました")
+
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
+        sys.exit(exit_code)
+
+    # 単一月指定時: 従来どおり共通スクレイピング処理を実行
     result = run_scraping(
-        target_year_month=target_year_month,
+        target_year_month=target_months[0],
         headless=args.headless,
-        upload_to_sheets=upload_to_sheets
+        upload_to_sheets=upload_to_sheets,
+        use_cache=not args.no_cache,
+        cache_ttl_sec=args.cache_ttl,
+        legacy_extract=args.legacy_extract,
+        nav_timeout=args.nav_timeout,
+        keep_csv=args.keep_csv,
+        force=args.force,
+        block_assets=not args.no_block_assets
     )
     
+    exit_code = _result_exit_code(result, upload_to_sheets)
+
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, default=str)
+        sys.stdout.write('\n')
+        sys.exit(exit_code)
+
     if result['success']:
-        print("\n" + "=" * 60)
-        print("✅ すべての処理が正常に完了しました")
-        print("=" * 60)
-        print(f"📊 処理結果: {result['period']}")
-        print(f"📈 抽出件数: {result['total_records']}件")
-        
+        # 結果サマリーはprintを繰り返さず1回のwriteでまとめて出力する
+        lines = ["", _SEPARATOR, "✅ すべての処理が正常に完了しました", _SEPARATOR,
+                 f"📊 処理結果: {result['period']}",
+                 f"📈 抽出件数: {result['total_records']}件"]
+
         if result['fishing_csv']:
-            print(f"💾 釣果データファイル: {result['fishing_csv']}")
+            lines.append(f"💾 釣果データファイル: {result['fishing_csv']}")
         if result['comment_csv']:
-            print(f"💾 コメントファイル: {result['comment_csv']}")
-        
+            lines.append(f"💾 コメントファイル: {result['comment_csv']}")
+
         # Google Sheets投入結果表示
         sheets_result = result.get('sheets_result', {})
         if upload_to_sheets:
             if sheets_result.get('success'):
-                print(f"✅ Google Sheets投入: 成功")
+                lines.append("✅ Google Sheets投入: 成功")
                 if 'message' in sheets_result:
-                    print(f"   {sheets_result['message']}")
+                    lines.append(f"   {sheets_result['message']}")
                 if 'spreadsheet_url' in sheets_result:
-                    print(f"🔗 スプレッドシートURL: {sheets_result['spreadsheet_url']}")
+                    lines.append(f"🔗 スプレッドシートURL: {sheets_result['spreadsheet_url']}")
             else:
-                print(f"❌ Google Sheets投入: 失敗")
+                lines.append("❌ Google Sheets投入: 失敗")
                 if 'error' in sheets_result:
-                    print(f"   エラー: {sheets_result['error']}")
-                print("💾 CSVファイルは保持されています")
+                    lines.append(f"   エラー: {sheets_result['error']}")
+                lines.append("💾 CSVファイルは保持されています")
         else:
-            print("⚠️ Google Sheets投入: スキップ（--no-sheetsオプション指定）")
-        
-        print("=" * 60)
-        sys.exit(0)
+            lines.append("⚠️ Google Sheets投入: スキップ（--no-sheetsオプション指定）")
+
+        lines.append(_SEPARATOR)
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
+        sys.exit(exit_code)
     else:
         print(f"\n❌処理が失敗しました: {result['error']}")
-        sys.exit(1)
+        sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file